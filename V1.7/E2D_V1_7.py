@@ -23,7 +23,8 @@ from core.state import AppState
 from ui.components import ProductLineManager
 from core.mapping import ColumnMapper
 from core.processing import ExcelProcessor
-from core.process_impl import process_raw_excel, get_sheets_with_data
+from core.jobs import BackgroundJob
+from core.process_impl import process_raw_excel, load_cleaned_sheets
 
 
 def build_mapping_content(container, column_mapper):
@@ -186,6 +187,7 @@ def create_app():
     start_date_var = tk.StringVar()
     end_date_var = tk.StringVar()
     replace_mode_var = tk.StringVar(value='overwrite')
+    cache_var = tk.BooleanVar(value=False)
     app_state = AppState()
 
     def load_app_state():
@@ -203,6 +205,7 @@ def create_app():
                 output_entry.set(ov)
                 app_state.output_dir = ov
             replace_mode_var.set(rm)
+            cache_var.set(bool(data.get('cache', False)))
         except Exception:
             pass
 
@@ -213,6 +216,7 @@ def create_app():
                 'input_file': app_state.input_file or input_entry.get().strip(),
                 'output_dir': app_state.output_dir or output_entry.get().strip(),
                 'replace_mode': replace_mode_var.get(),
+                'cache': cache_var.get(),
             }
             with open('app_state.json', 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
@@ -246,6 +250,8 @@ def create_app():
     ttk.Label(file_frame, text="输出目录:").grid(row=1, column=0, sticky=tk.W, pady=(0, 12))
     ttk.Entry(file_frame, textvariable=output_entry, width=42, font=ENTRY_FONT).grid(row=1, column=1, sticky=tk.EW, padx=(12, 12), pady=(0, 12))
     ttk.Button(file_frame, text="浏览", command=select_output_dir).grid(row=1, column=2, pady=(0, 12))
+    # 缓存整本解析结果，同一文件重复处理更快，但读取时不再按日期范围预筛选
+    ttk.Checkbutton(file_frame, text="缓存解析结果（同一文件反复处理时更快）", variable=cache_var, command=save_app_state).grid(row=2, column=1, sticky=tk.W, padx=(12, 12), pady=(0, 8))
 
     date_frame = ttk.LabelFrame(main_tab, text="▌日期筛选", padding=16)
     date_frame.pack(fill=tk.X, pady=(0, 25))
@@ -394,37 +400,28 @@ def create_app():
             if not inp or not os.path.exists(inp):
                 messagebox.showerror("错误", "请先选择有效的输入文件")
                 return
-            sheets = get_sheets_with_data(inp)
-            if not sheets:
+            try:
+                combined = load_cleaned_sheets(inp, cache=cache_var.get())
+            except Exception:
+                combined = None
+            if combined is None or combined.empty:
                 messagebox.showerror("错误", "未找到包含数据的工作表")
                 return
-            import pandas as pd
             from core import transform as transform_core
             column_mapper_local = ColumnMapper()
+            matched = transform_core.dynamic_column_matching(combined, column_mapper_local)
+            src_col = matched.get('产品线')
+            if not src_col:
+                src_col = next((col for col in combined.columns if '产品' in str(col)), None)
             total = 0
             affected = {p: 0 for p, _ in pl_manager.get_mappings()}
-            for s in sheets:
-                try:
-                    df = pd.read_excel(inp, sheet_name=s, header=1, converters={'发起时间': str})
-                    df = transform_core.deep_clean_columns(df)
-                    matched = transform_core.dynamic_column_matching(df, column_mapper_local)
-                    src_col = None
-                    if '产品线' in matched:
-                        src_col = matched['产品线']
-                    if not src_col:
-                        for col in df.columns:
-                            if '产品' in str(col):
-                                src_col = col
-                                break
-                    if not src_col:
-                        continue
-                    total += len(df)
-                    ser = df[src_col].astype(str).str.strip().str.lower()
-                    for p, _c in pl_manager.get_mappings():
-                        cnt = (ser == str(p).strip().lower()).sum()
-                        affected[p] = affected.get(p, 0) + int(cnt)
-                except Exception:
-                    continue
+            if src_col:
+                has_col = combined[src_col].notna().groupby(combined['数据来源'], observed=True).transform('any')
+                scoped = combined.loc[has_col, src_col]
+                total = len(scoped)
+                counts = transform_core.product_keys(scoped).value_counts()
+                for p in affected:
+                    affected[p] = int(counts.get(str(p).strip().lower(), 0))
             lines = [f"总行数：{total}"] + [f"{p}：{n} 行" for p, n in affected.items()]
             messagebox.showinfo("预览", "\n".join(lines))
         except Exception as e:
@@ -451,6 +448,8 @@ def create_app():
     processor = ExcelProcessor(process_raw_excel)
 
     def start_process():
+        if str(process_btn.cget("state")) == "disabled":
+            return
         inp = app_state.input_file or input_entry.get().strip()
         outp = app_state.output_dir or output_entry.get().strip()
         if not inp or not outp:
@@ -491,14 +490,14 @@ def create_app():
         pbar.pack(pady=(0, 12))
         plabel = ttk.Label(card, text="准备处理...", font=LABEL_FONT)
         plabel.pack()
-        import threading
-        cancel_event = threading.Event()
-        make_button(card, text="取消", command=lambda: cancel_event.set(), width=10, role="danger").pack(pady=(8, 0))
+        job = None
+
+        def cancel_job():
+            if job is not None:
+                job.cancel()
+                plabel.config(text="正在取消...")
 
-        def upd(p, m):
-            pvar.set(p)
-            plabel.config(text=m)
-            ov.update_idletasks()
+        make_button(card, text="取消", command=cancel_job, width=10, role="danger").pack(pady=(8, 0))
 
         from datetime import datetime
         sd = app_state.start_date or start_date_var.get() or today.strftime("%Y/%m/%d")
@@ -506,7 +505,6 @@ def create_app():
         sdt = datetime.strptime(sd, "%Y/%m/%d")
         edt = datetime.strptime(ed, "%Y/%m/%d")
         out_file = f"{outp}/处理结果_{datetime.now().strftime('%Y%m%d%H%M')}.xlsx"
-        ok = False
         valid, msg = processor.validate_mappings(pl_manager.get_mappings())
         if not valid:
             messagebox.showerror("错误", msg)
@@ -517,63 +515,77 @@ def create_app():
             process_btn.configure(state="normal")
             exit_btn.configure(state="normal")
             return
-        try:
-            ok = processor.process(
-                inp,
-                out_file,
-                sdt,
-                edt,
-                pl_manager.get_mappings(),
-                replace_mode=replace_mode_var.get(),
-                progress_callback=upd,
-                cancel_event=cancel_event,
-            )
-        except Exception as e:
-            messagebox.showerror("错误", str(e))
-        finally:
+
+        def finish(ok):
             try:
                 ov.destroy()
             except Exception:
                 pass
             process_btn.configure(state="normal")
             exit_btn.configure(state="normal")
-        if ok:
-            try:
-                ans = messagebox.askyesno("完成", "处理完成，是否立即打开文件？")
-                if ans:
-                    os.startfile(out_file)
-                ans2 = messagebox.askyesno("完成", "是否打开输出目录？")
-                if ans2:
-                    try:
-                        os.startfile(os.path.dirname(out_file))
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-        else:
-            try:
-                t = tk.Toplevel(root)
-                t.overrideredirect(True)
-                t.attributes("-topmost", True)
-                t.configure(bg="#9CA3AF")
-                l = tk.Label(t, text="处理已取消或失败", fg="white", bg="#9CA3AF", font=("Microsoft YaHei UI", 10))
-                l.pack(padx=12, pady=8)
-                tw = l.winfo_reqwidth() + 24
-                th = l.winfo_reqheight() + 16
-                root.update_idletasks()
-                rx = root.winfo_rootx()
-                ry = root.winfo_rooty()
-                rw = root.winfo_width()
-                rh = root.winfo_height()
-                t.geometry(f"{tw}x{th}+{rx + rw//2 - tw//2}+{ry + rh - th - 40}")
-                def _ac():
-                    try:
-                        t.destroy()
-                    except Exception:
-                        pass
-                t.after(1800, _ac)
-            except Exception:
-                pass
+            if ok:
+                try:
+                    ans = messagebox.askyesno("完成", "处理完成，是否立即打开文件？")
+                    if ans:
+                        os.startfile(out_file)
+                    ans2 = messagebox.askyesno("完成", "是否打开输出目录？")
+                    if ans2:
+                        try:
+                            os.startfile(os.path.dirname(out_file))
+                        except Exception:
+                            pass
+                except Exception:
+                    pass
+            else:
+                try:
+                    t = tk.Toplevel(root)
+                    t.overrideredirect(True)
+                    t.attributes("-topmost", True)
+                    t.configure(bg="#9CA3AF")
+                    l = tk.Label(t, text="处理已取消或失败", fg="white", bg="#9CA3AF", font=("Microsoft YaHei UI", 10))
+                    l.pack(padx=12, pady=8)
+                    tw = l.winfo_reqwidth() + 24
+                    th = l.winfo_reqheight() + 16
+                    root.update_idletasks()
+                    rx = root.winfo_rootx()
+                    ry = root.winfo_rooty()
+                    rw = root.winfo_width()
+                    rh = root.winfo_height()
+                    t.geometry(f"{tw}x{th}+{rx + rw//2 - tw//2}+{ry + rh - th - 40}")
+                    def _ac():
+                        try:
+                            t.destroy()
+                        except Exception:
+                            pass
+                    t.after(1800, _ac)
+                except Exception:
+                    pass
+
+        def pump():
+            for event in job.poll():
+                if event[0] == 'progress':
+                    pvar.set(event[1])
+                    plabel.config(text=event[2])
+                elif event[0] == 'done':
+                    finish(bool(event[1]))
+                    return
+                else:
+                    messagebox.showerror("错误", str(event[1]))
+                    finish(False)
+                    return
+            root.after(16, pump)
+
+        job = BackgroundJob(
+            processor.process,
+            inp,
+            out_file,
+            sdt,
+            edt,
+            pl_manager.get_mappings(),
+            replace_mode=replace_mode_var.get(),
+            cache=cache_var.get(),
+        ).start()
+        root.after(16, pump)
 
     load_app_state()
     root.bind("<Return>", lambda e: start_process())
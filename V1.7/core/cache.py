@@ -0,0 +1,125 @@
+import hashlib
+import os
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_ARROW = True
+except Exception:
+    _HAS_ARROW = False
+
+DEFAULT_CACHE_DIR = os.environ.get('E2D_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.excel2ding', 'cache')
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class WorkbookCache:
+    """已解析工作簿的磁盘缓存。
+
+    以 路径+大小+修改时间+内容哈希 为键保存清洗合并后的数据（Arrow IPC，缺少 pyarrow 时用 pickle），
+    命中时刷新文件时间，超出总容量时按最近最少使用淘汰。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._digests = {}
+
+    def key(self, path):
+        st = os.stat(path)
+        ident = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        if ident not in self._digests:
+            self._digests[ident] = file_digest(path)
+        raw = '|'.join(str(v) for v in ident + (self._digests[ident],))
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _entries(self, key):
+        return [os.path.join(self.cache_dir, f"{key}{ext}") for ext in ('.arrow', '.pkl')]
+
+    def load(self, path):
+        try:
+            key = self.key(path)
+        except OSError:
+            return None
+        for entry in self._entries(key):
+            if not os.path.exists(entry):
+                continue
+            try:
+                df = pd.read_feather(entry) if entry.endswith('.arrow') else pd.read_pickle(entry)
+                os.utime(entry)
+                return df
+            except Exception:
+                try:
+                    os.remove(entry)
+                except OSError:
+                    pass
+        return None
+
+    def store(self, path, df):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            arrow_entry, pickle_entry = self._entries(self.key(path))
+            written = None
+            if _HAS_ARROW:
+                try:
+                    df.reset_index(drop=True).to_feather(arrow_entry + '.tmp')
+                    written = arrow_entry
+                except Exception:
+                    written = None
+            if written is None:
+                df.to_pickle(pickle_entry + '.tmp')
+                written = pickle_entry
+            os.replace(written + '.tmp', written)
+            self.evict()
+        except Exception:
+            pass
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(('.arrow', '.pkl')):
+                continue
+            full = os.path.join(self.cache_dir, name)
+            st = os.stat(full)
+            entries.append((st.st_mtime, st.st_size, full))
+        total = sum(size for _t, size, _p in entries)
+        for _t, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(full)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(('.arrow', '.pkl', '.tmp')):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+_default_cache = None
+
+
+def resolve_cache(cache):
+    """cache 可为 None/False（不缓存）、True（默认缓存目录）或 WorkbookCache 实例。"""
+    global _default_cache
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        if _default_cache is None:
+            _default_cache = WorkbookCache()
+        return _default_cache
+    return cache
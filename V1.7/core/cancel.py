@@ -0,0 +1,59 @@
+import threading
+
+
+class ProcessCancelled(Exception):
+    """处理过程中检测到取消请求。"""
+
+
+def is_cancelled(cancel_event):
+    return bool(cancel_event and getattr(cancel_event, 'is_set', None) and cancel_event.is_set())
+
+
+def check_cancelled(cancel_event):
+    if is_cancelled(cancel_event):
+        raise ProcessCancelled()
+
+
+def run_cancellable(func, cancel_event, cleanup=None, poll=0.05, on_poll=None):
+    """在后台线程执行无法中途检查取消的调用（如解析整本工作簿），每 poll 秒轮询一次取消。
+
+    取消时立即抛出 ProcessCancelled，不等待调用结束；调用随后完成时由后台线程对结果执行 cleanup。
+    on_poll 在每次轮询时调用，可用于上报进度。
+    """
+    if cancel_event is None and on_poll is None:
+        return func()
+    state = {}
+    lock = threading.Lock()
+
+    def run():
+        try:
+            result = func()
+        except BaseException as e:
+            with lock:
+                state['error'] = e
+            return
+        with lock:
+            abandoned = state.get('abandoned', False)
+            state['result'] = result
+        if abandoned and cleanup is not None:
+            try:
+                cleanup(result)
+            except Exception:
+                pass
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    while worker.is_alive():
+        if is_cancelled(cancel_event):
+            with lock:
+                if 'result' not in state and 'error' not in state:
+                    state['abandoned'] = True
+                    raise ProcessCancelled()
+            break
+        if on_poll is not None:
+            on_poll()
+        worker.join(poll)
+    worker.join()
+    if 'error' in state:
+        raise state['error']
+    return state['result']
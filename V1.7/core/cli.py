@@ -0,0 +1,168 @@
+"""命令行入口：无界面批处理，不加载任何 UI 模块。
+
+用法示例::
+
+    python -m core 输入.xlsx -o 输出目录 --start 2025/11/01 --end 2025/11/30 --map 电子纸=张三
+    python -m core 导出目录/ -o 输出目录 --jobs 4            # 批量处理目录下所有导出
+    python -m core "导出/*.xlsx" -o 汇总.xlsx --merge        # 合并为一个结果文件
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+from core.processing import ExcelProcessor
+from core.process_impl import process_raw_excel
+from core import writer as writer_core
+from core import batch as batch_core
+from core import report as report_core
+
+
+def _parse_date(text):
+    for fmt in ("%Y/%m/%d", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"无效日期: {text}，应为 YYYY/MM/DD")
+
+
+def _parse_mapping(text):
+    product, sep, contact = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"无效映射: {text}，应为 产品线=对接人")
+    return product.strip(), contact.strip()
+
+
+def load_mappings_file(path):
+    """读取与界面“保存到文件”相同格式的产品线映射文件。"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [(item.get('product', '').strip(), item.get('contact', '').strip()) for item in data.get('mappings', [])]
+
+
+def default_output_file(output, output_format=None):
+    ext = writer_core.OUTPUT_FORMATS[writer_core.detect_format(output or '', output_format)]
+    name = f"处理结果_{datetime.now().strftime('%Y%m%d%H%M')}{ext}"
+    if not output:
+        return name
+    if os.path.isdir(output):
+        return os.path.join(output, name)
+    return output
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m core', description='Excel2Ding 命令行批处理')
+    parser.add_argument('input', help='输入 Excel 文件；目录或通配符时进入批处理模式')
+    parser.add_argument('-o', '--output', help='输出文件或目录，默认当前目录下 处理结果_YYYYMMDDHHMM.xlsx')
+    parser.add_argument('-f', '--format', dest='output_format', choices=sorted(writer_core.OUTPUT_FORMATS), help='输出格式，默认按扩展名判断')
+    parser.add_argument('--start', type=_parse_date, help='开始日期 YYYY/MM/DD')
+    parser.add_argument('--end', type=_parse_date, help='结束日期 YYYY/MM/DD')
+    parser.add_argument('--map', dest='mappings', action='append', type=_parse_mapping, default=[], metavar='产品线=对接人', help='产品线-对接人映射，可重复')
+    parser.add_argument('--mappings-file', help='产品线映射 JSON 文件（界面导出的 product_mapping.json）')
+    parser.add_argument('--replace-mode', choices=['overwrite', 'fill_empty'], default='overwrite', help='替换模式')
+    parser.add_argument('--streaming', action='store_true', help='流式读取，只保留日期范围内的行')
+    parser.add_argument('--workers', type=int, help='并行解析工作表的进程数')
+    parser.add_argument('--cache', action='store_true', help='启用已解析工作簿缓存')
+    parser.add_argument('--arrow-strings', action='store_true', help='文本列以 string[pyarrow] 存储，降低大文件的内存占用（需要 pyarrow）')
+    parser.add_argument('--state', help='增量处理状态文件：只处理相对上次新增或变更的行')
+    parser.add_argument('--jobs', type=int, help='批处理时同时处理的文件数，默认 CPU 核数')
+    parser.add_argument('--merge', action='store_true', help='批处理时合并为一个输出文件（-o 指定文件路径）')
+    parser.add_argument('--report', action='store_true', help='在结果文件旁写出各阶段耗时报告 <结果文件名>.report.json')
+    parser.add_argument('-q', '--quiet', action='store_true', help='不输出进度')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    batch_mode = os.path.isdir(args.input) or glob.has_magic(args.input)
+    if not batch_mode and not os.path.exists(args.input):
+        parser.error(f"输入文件不存在: {args.input}")
+    if (args.start is None) != (args.end is None):
+        parser.error("--start 与 --end 需同时指定")
+    mappings = list(args.mappings)
+    if args.mappings_file:
+        mappings = load_mappings_file(args.mappings_file) + mappings
+    processor = ExcelProcessor(process_raw_excel)
+    if mappings:
+        valid, msg = processor.validate_mappings(mappings)
+        if not valid:
+            parser.error(msg)
+    if batch_mode:
+        if args.state:
+            parser.error("--state 仅用于单个文件")
+        return _run_batch(args, mappings)
+    output_file = default_output_file(args.output, args.output_format)
+
+    printed = {}
+
+    def progress(percent, message):
+        # 节流后的进度仍可能每秒多条，只在百分比或阶段变化时输出一行
+        stage = message.split('（预计剩余')[0]
+        if args.quiet or printed.get('last') == (percent, stage):
+            return
+        printed['last'] = (percent, stage)
+        print(f"[{percent:3d}%] {message}", file=sys.stderr)
+
+    report = report_core.RunReport()
+    try:
+        ok = processor.process(
+            args.input,
+            output_file,
+            args.start,
+            args.end,
+            mappings,
+            replace_mode=args.replace_mode,
+            progress_callback=progress,
+            output_format=args.output_format,
+            streaming=args.streaming,
+            workers=args.workers,
+            cache=args.cache,
+            state=args.state,
+            arrow_strings=args.arrow_strings,
+            report=report,
+            report_json=args.report,
+        )
+    except Exception as e:
+        logging.error("处理失败: %s", e)
+        return 1
+    if not ok:
+        return 1
+    if args.report and not args.quiet:
+        print(report.format_table(), file=sys.stderr)
+    print(writer_core.output_path(output_file, args.output_format))
+    return 0
+
+
+def _run_batch(args, mappings):
+    merge_output = default_output_file(args.output, args.output_format) if args.merge else None
+    try:
+        summaries = batch_core.process_batch(
+            args.input,
+            output_dir=None if args.merge else args.output,
+            start_date=args.start,
+            end_date=args.end,
+            product_contact_list=mappings,
+            replace_mode=args.replace_mode,
+            max_workers=args.jobs,
+            merge_output=merge_output,
+            output_format=args.output_format,
+            streaming=args.streaming,
+            workers=args.workers,
+            cache=args.cache,
+            arrow_strings=args.arrow_strings,
+            report_json=args.report,
+        )
+    except Exception as e:
+        logging.error("批处理失败: %s", e)
+        return 1
+    for summary in summaries:
+        status = "OK" if summary.ok else f"失败: {summary.error}"
+        print(f"{summary.input_file}\t{summary.rows_in}\t{summary.rows_kept}\t{summary.duration:.2f}s\t{status}\t{summary.output_file}")
+    return 0 if all(summary.ok for summary in summaries) else 1
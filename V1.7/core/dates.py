@@ -0,0 +1,123 @@
+import re
+import pandas as pd
+from core import cancel as cancel_core
+
+_YMD_PATTERN = r'(?P<year>\d{4})[-/.](?P<month>\d{1,2})[-/.](?P<day>\d{1,2})(?:[ T]+(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?)?'
+_YMD_PROBE = re.compile(r'\d{4}[-/.]\d{1,2}[-/.]\d{1,2}')
+_SERIAL_RE = re.compile(r'^\d{1,6}(?:\.\d+)?$')
+_SCAN_PATTERN = r'(\d{4}-\d{2}-\d{2}(?:\s+\d{2}:\d{2}:\d{2})?)'
+
+# Excel 序列号合理区间：1927-05-18 ~ 2173-10-14
+SERIAL_MIN = 10000
+SERIAL_MAX = 100000
+
+# 可取消解析时每块的行数，块之间检查取消
+PARSE_CHUNK_ROWS = 20000
+
+
+def _as_text(series):
+    return series.astype(object).where(series.notna(), '').astype(str).str.strip()
+
+
+def detect_format(series, sample_size=200):
+    """根据非空样本判断日期列格式：ymd / serial / mixed / unknown。"""
+    sample = _as_text(series)
+    sample = sample[sample != ''].head(sample_size)
+    if sample.empty:
+        return 'unknown'
+    is_ymd = sample.str.contains(_YMD_PROBE)
+    is_serial = sample.str.match(_SERIAL_RE)
+    if is_ymd.all():
+        return 'ymd'
+    if is_serial.all():
+        return 'serial'
+    if (is_ymd | is_serial).any():
+        return 'mixed'
+    return 'unknown'
+
+
+def _parse_ymd(text):
+    parts = text.str.extract(_YMD_PATTERN)
+    parts = parts.apply(pd.to_numeric, errors='coerce')
+    parts[['hour', 'minute', 'second']] = parts[['hour', 'minute', 'second']].fillna(0)
+    return pd.to_datetime(parts, errors='coerce')
+
+
+def excel_serial_to_datetime(values):
+    """Excel 序列号（如 45757.6148148148）整列转换为 datetime，精确到秒。"""
+    numbers = pd.to_numeric(values, errors='coerce')
+    numbers = numbers.where((numbers >= SERIAL_MIN) & (numbers < SERIAL_MAX))
+    seconds = (numbers * 86400).round()
+    return pd.to_datetime(seconds, unit='s', origin='1899-12-30', errors='coerce')
+
+
+def _parse_serial(text):
+    return excel_serial_to_datetime(text)
+
+
+def parse_datetime_column(series, fmt=None, cancel_event=None):
+    """整列向量化解析日期；格式只探测一次，决定解析顺序，未命中的值再按其他格式补齐。
+
+    传入 cancel_event 时按 PARSE_CHUNK_ROWS 分块解析，块之间检查取消。
+    """
+    if cancel_event is not None and len(series) > PARSE_CHUNK_ROWS:
+        fmt = fmt or detect_format(series)
+        chunks = []
+        for start in range(0, len(series), PARSE_CHUNK_ROWS):
+            cancel_core.check_cancelled(cancel_event)
+            chunks.append(parse_datetime_column(series.iloc[start:start + PARSE_CHUNK_ROWS], fmt))
+        return pd.concat(chunks)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return excel_serial_to_datetime(series).astype('datetime64[ns]')
+    text = _as_text(series)
+    fmt = fmt or detect_format(text)
+    if fmt == 'serial':
+        parsers = [_parse_serial, _parse_ymd]
+    elif fmt == 'unknown':
+        parsers = []
+    else:
+        parsers = [_parse_ymd, _parse_serial]
+    parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    for parser in parsers:
+        missing = parsed.isna() & (text != '')
+        if not missing.any():
+            break
+        parsed[missing] = parser(text[missing])
+    missing = parsed.isna() & (text != '')
+    if missing.any():
+        parsed[missing] = pd.to_datetime(text[missing], errors='coerce', format='mixed')
+    return parsed
+
+
+def scan_frame_for_dates(df):
+    """兜底：逐列向量化搜索日期文本，取每行从左到右第一个命中值。"""
+    found = pd.Series(None, index=df.index, dtype=object)
+    for col in df.columns:
+        if not found.isna().any():
+            break
+        matches = _as_text(df[col]).str.extract(_SCAN_PATTERN, expand=False)
+        found = found.fillna(matches)
+    return pd.to_datetime(found, errors='coerce', format='mixed')
+
+
+TIME_COLUMN_KEYWORDS = ['发起时间', '创建时间']
+
+
+def find_time_column(columns):
+    for keyword in TIME_COLUMN_KEYWORDS:
+        for col in columns:
+            if keyword in str(col):
+                return col
+    return None
+
+
+def parse_time_column(df, fallback=True, cancel_event=None):
+    time_column = find_time_column(df.columns)
+    if time_column is not None:
+        parsed = parse_datetime_column(df[time_column], cancel_event=cancel_event)
+    else:
+        parsed = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    if fallback and parsed.isna().all() and len(df):
+        cancel_core.check_cancelled(cancel_event)
+        parsed = scan_frame_for_dates(df)
+    return parsed
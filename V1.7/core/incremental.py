@@ -0,0 +1,152 @@
+"""增量处理：保存已处理行的结果，每周导出只处理新增或变更的行。
+
+状态中每个输入行对应一条记录：行指纹（发起时间+项目名称+发起人）、全部数据列的内容摘要、
+解析后的时间（parsed_time），以及该行在映射产品线之前的输出列。状态覆盖全部输入行、与日期范围
+无关：再次运行时指纹与摘要都相同的行直接复用，其余行按常规流程处理后合并，日期筛选、
+产品线映射与排序都在合并后的结果上进行，调整日期范围后仍可复用全部行。
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from core import mapping as mapping_core
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_ARROW = True
+except Exception:
+    _HAS_ARROW = False
+
+STATE_VERSION = 3
+KEY_COLUMNS = ['发起时间', '项目名称', '对接人（发起人）']
+# 不参与内容比较的辅助列
+AUX_COLUMNS = ('数据来源', 'parsed_time')
+
+FINGERPRINT = '_fingerprint'
+DIGEST = '_digest'
+OCCURRENCE = '_occurrence'
+IDENTITY = [FINGERPRINT, DIGEST, OCCURRENCE]
+
+
+def _hash_rows(df, columns):
+    if not columns:
+        return pd.Series(0, index=df.index, dtype='uint64')
+    return pd.util.hash_pandas_object(df[columns], index=False)
+
+
+def row_identity(df):
+    """返回每行的 (指纹, 内容摘要, 同内容重复序号)，索引与 df 一致。"""
+    sources = mapping_core.ColumnMapper.default_output_index().resolve(df.columns, alias_priority=True)
+    keys = [sources[c] for c in KEY_COLUMNS if c in sources]
+    data = [c for c in df.columns if c not in AUX_COLUMNS]
+    ident = pd.DataFrame({FINGERPRINT: _hash_rows(df, keys), DIGEST: _hash_rows(df, data)}, index=df.index)
+    ident[OCCURRENCE] = ident.groupby([FINGERPRINT, DIGEST]).cumcount()
+    return ident
+
+
+def signature(df, column_mapper):
+    """影响逐行结果的参数；与上次不一致时状态作废，全部重新处理。日期范围在合并后筛选，不在其中。"""
+    return {
+        'version': STATE_VERSION,
+        'columns': [str(c) for c in df.columns if c not in AUX_COLUMNS],
+        'mapping': column_mapper.column_mapping,
+        'output_columns': column_mapper.output_columns,
+    }
+
+
+class RowStateStore:
+    """增量状态文件：<path>.json 记录参数签名，<path>.arrow（缺少 pyarrow 时 .pkl）保存各行记录。"""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+
+    @property
+    def meta_path(self):
+        return self.path + '.json'
+
+    def _entries(self):
+        return [self.path + ext for ext in ('.arrow', '.pkl')]
+
+    def load(self, sig):
+        """签名一致时返回状态表，否则返回 None。"""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except Exception:
+            return None
+        if meta.get('signature') != json.loads(json.dumps(sig, ensure_ascii=False, default=str)):
+            return None
+        for entry in self._entries():
+            if not os.path.exists(entry):
+                continue
+            try:
+                df = pd.read_feather(entry) if entry.endswith('.arrow') else pd.read_pickle(entry)
+            except Exception:
+                continue
+            if len(df) == meta.get('rows'):
+                return df
+        return None
+
+    def store(self, sig, df):
+        try:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(folder, exist_ok=True)
+            df = df.reset_index(drop=True)
+            arrow_entry, pickle_entry = self._entries()
+            written = None
+            if _HAS_ARROW:
+                try:
+                    df.to_feather(arrow_entry + '.tmp')
+                    written = arrow_entry
+                except Exception:
+                    written = None
+            if written is None:
+                df.to_pickle(pickle_entry + '.tmp')
+                written = pickle_entry
+            os.replace(written + '.tmp', written)
+            for entry in self._entries():
+                if entry != written and os.path.exists(entry):
+                    os.remove(entry)
+            with open(self.meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'signature': sig, 'rows': len(df)}, f, ensure_ascii=False, default=str)
+            os.replace(self.meta_path + '.tmp', self.meta_path)
+        except Exception:
+            pass
+
+    def clear(self):
+        for entry in self._entries() + [self.meta_path]:
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+
+
+def resolve_state(state):
+    """state 可为 None/False（不启用）、状态文件路径或 RowStateStore 实例。"""
+    if state is None or state is False:
+        return None
+    if isinstance(state, RowStateStore):
+        return state
+    return RowStateStore(state)
+
+
+def split_rows(ident, prior):
+    """按 (指纹, 摘要, 序号) 与上次状态匹配，返回 (可复用的状态行（索引为当前行号）, 需处理的行掩码)。"""
+    if prior is None or not len(prior):
+        return pd.DataFrame(), pd.Series(True, index=ident.index)
+    current = ident.reset_index(names='_row')
+    matched = current.merge(prior, on=IDENTITY, how='inner').set_index('_row')
+    matched.index.name = None
+    return matched, pd.Series(~ident.index.isin(matched.index), index=ident.index)
+
+
+def merge_rows(ident, is_new, output_df, reused):
+    """合并新处理的行与复用的行，返回 (按原行序排列的输出表, 新状态表)。
+
+    状态覆盖全部输入行，日期范围由调用方在合并后的输出表上筛选。
+    """
+    fresh = ident[is_new].join(output_df)
+    state_df = pd.concat([reused, fresh]).sort_index() if len(reused) else fresh
+    return state_df.reindex(columns=list(output_df.columns)), state_df
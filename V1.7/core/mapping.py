@@ -1,5 +1,30 @@
 import json
 import os
+from core.transform import normalize_column_name
+
+
+class AliasIndex:
+    """别名倒排索引：规范化别名 -> [(目标列, 别名优先级)]，按映射顺序保存。"""
+
+    def __init__(self, mapping):
+        self.targets = list(mapping)
+        self._index = {}
+        for target, aliases in mapping.items():
+            for rank, alias in enumerate(aliases):
+                self._index.setdefault(normalize_column_name(alias), []).append((target, rank))
+
+    def resolve(self, columns, alias_priority=False):
+        """单次遍历列名，返回 目标列 -> 源列。
+
+        默认取最靠左的命中列；alias_priority=True 时优先取排位靠前的别名。
+        """
+        best = {}
+        for pos, col in enumerate(columns):
+            for target, rank in self._index.get(normalize_column_name(col), ()):
+                key = (rank, pos) if alias_priority else (pos, rank)
+                if target not in best or key < best[target][0]:
+                    best[target] = (key, col)
+        return {target: best[target][1] for target in self.targets if target in best}
 
 
 class ColumnMapper:
@@ -39,9 +64,55 @@ class ColumnMapper:
         '定制人': '定制人/销售经理'
     }
 
+    # 按输出列名组织的兜底别名，仅在用户映射未命中时按别名顺序使用，不影响 DEFAULT_MAPPING 的匹配
+    OUTPUT_ALIASES = {
+        '对接人（发起人）': ['发起人姓名', '对接人'],
+        '发起时间': ['发起时间', '创建时间'],
+        '当前周': ['当前周'],
+        '项目名称': ['项目名称', '项目'],
+        '产品线': ['产品线', '产品'],
+        '当前进度': ['申请状态', '当前进度'],
+        '特制化比例(%)': ['特制化比例(%)', '特制化比例'],
+        '可常规化比例(%)': ['可常规化比例(%)', '可常规化比例'],
+        '建议报价(元)': ['建议报价(元)', '报价金额'],
+        '定制内容': ['定制内容'],
+        '软件版本/产品名称': ['软件版本/产品名称', '产品名称'],
+        '硬件情况（分辨率）/原产品主型号': ['硬件情况（分辨率）/原产品主型号', '原产品主型号'],
+        '销售部门': ['销售部门'],
+        '定制人/销售经理': ['定制人/销售经理', '销售经理'],
+    }
+
+    _default_output_index = None
+
     def __init__(self):
+        self._alias_index = None
         self.load_mapping()
 
+    @property
+    def column_mapping(self):
+        return self._column_mapping
+
+    @column_mapping.setter
+    def column_mapping(self, value):
+        self._column_mapping = value
+        self._alias_index = None
+
+    @classmethod
+    def default_output_index(cls):
+        """OUTPUT_ALIASES 的别名索引，用于用户映射未覆盖的输出列。"""
+        if cls._default_output_index is None:
+            cls._default_output_index = AliasIndex(cls.OUTPUT_ALIASES)
+        return cls._default_output_index
+
+    def alias_index(self):
+        if self._alias_index is None:
+            self._alias_index = AliasIndex(self.column_mapping)
+        return self._alias_index
+
+    def resolve(self, columns):
+        """返回 目标列 -> 源列 的完整匹配结果。"""
+        return self.alias_index().resolve(columns)
+
     def load_mapping(self):
         try:
             if os.path.exists('column_mapping.json'):
@@ -84,3 +155,4 @@ class ColumnMapper:
 
     def get_output_columns(self):
         return self.output_columns
+
@@ -0,0 +1,58 @@
+import multiprocessing
+import os
+from core import cancel as cancel_core
+from core import dates as dates_core
+from core import transform as transform_core
+from core import workbook as workbook_core
+
+
+def _load_sheet(file_path, sheet_name, arrow_strings=False, start_date=None, end_date=None):
+    with workbook_core.WorkbookSession(file_path) as session:
+        df = session.read_sheet(sheet_name, header=1, converters={'发起时间': str})
+    df = transform_core.deep_clean_columns(df)
+    df['数据来源'] = sheet_name
+    if start_date and end_date:
+        rows = len(df)
+        df['parsed_time'] = dates_core.parse_time_column(df, fallback=False)
+        if df['parsed_time'].notna().any():
+            # 本表已有可解析的时间，不会再按行文本兜底，直接筛选；否则原样返回，由主进程结合其他工作表处理
+            df = df[(df['parsed_time'] >= start_date) & (df['parsed_time'] <= end_date)].copy()
+            df.attrs['dates_found'] = True
+        df.attrs['rows_read'] = rows
+    return transform_core.compact(df, arrow_strings)
+
+
+def load_sheets_parallel(file_path, sheet_names, workers=None, progress=None, cancel_event=None, arrow_strings=False, start_date=None, end_date=None):
+    """在进程池中并行解析工作表，按原工作表顺序返回清洗后的 DataFrame 列表。
+
+    取消时终止全部工作进程（包括正在解析的工作表）并返回 None；单个工作表失败时跳过，与串行读取一致。
+    给出日期范围时各进程只返回范围内的行（含 parsed_time 列），attrs['rows_read'] 为读取行数；
+    时间均无法解析的工作表原样返回（attrs 中无 dates_found），由调用方交给 DateRangeFilter 处理。
+    """
+    workers = min(workers or os.cpu_count() or 1, len(sheet_names))
+    pool = multiprocessing.Pool(processes=workers)
+    results = {}
+    try:
+        pending = {name: pool.apply_async(_load_sheet, (file_path, name, arrow_strings, start_date, end_date)) for name in sheet_names}
+        finished = 0
+        while pending:
+            if cancel_core.is_cancelled(cancel_event):
+                return None
+            done = [name for name, result in pending.items() if result.ready()]
+            if not done:
+                next(iter(pending.values())).wait(0.1)
+                continue
+            for name in done:
+                result = pending.pop(name)
+                finished += 1
+                try:
+                    results[name] = result.get()
+                except Exception:
+                    continue
+                if progress is not None:
+                    progress.sheet_done(name, f"已读取工作表: {name} ({finished}/{len(sheet_names)})")
+    finally:
+        # 终止工作进程：取消时正在解析的工作表也随之中止，不在后台继续运行
+        pool.terminate()
+        pool.join()
+    return [results[name] for name in sheet_names if name in results]
@@ -27,7 +27,7 @@ class ExcelProcessor:
             seen.add(key)
         return True, "OK"
 
-    def process(self, input_file, output_file, start_dt, end_dt, product_contact_list, replace_mode='overwrite', progress_callback=None, cancel_event=None):
+    def process(self, input_file, output_file, start_dt, end_dt, product_contact_list, replace_mode='overwrite', progress_callback=None, cancel_event=None, output_format=None, **options):
         logging.info(
             "开始处理: input=%s, output=%s, range=%s-%s, mappings=%s, mode=%s",
             input_file,
@@ -46,4 +46,7 @@ class ExcelProcessor:
             replace_mode=replace_mode,
             progress_callback=progress_callback,
             cancel_event=cancel_event,
+            output_format=output_format,
+            **options,
         )
+
@@ -1,5 +1,21 @@
 import re
+from functools import lru_cache
 import pandas as pd
+from core import dates as dates_core
+
+_NAME_NOISE = re.compile(r'[\s：()（）\n\t]')
+# 文本列不同取值数不超过行数的这一比例时转为 category（产品线、申请状态、销售部门、数据来源等）
+CATEGORY_MAX_RATIO = 0.1
+ARROW_STRING_DTYPE = 'string[pyarrow]'
+
+
+@lru_cache(maxsize=4096)
+def _normalize(name):
+    return _NAME_NOISE.sub('', name).strip()
+
+
+def normalize_column_name(name):
+    return _normalize(str(name))
 
 
 def deep_clean_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -9,30 +25,117 @@ def deep_clean_columns(df: pd.DataFrame) -> pd.DataFrame:
             if len(df) > 0:
                 first_row_value = str(df.iloc[0][col]) if not pd.isna(df.iloc[0][col]) else ''
                 if first_row_value and not first_row_value.startswith('Unnamed:'):
-                    cleaned_columns.append(re.sub(r'[\s：()（）\n\t]', '', first_row_value).strip())
+                    cleaned_columns.append(normalize_column_name(first_row_value))
                 else:
                     cleaned_columns.append(str(col))
             else:
                 cleaned_columns.append(str(col))
         else:
-            cleaned_columns.append(re.sub(r'[\s：()（）\n\t]', '', str(col)).strip())
+            cleaned_columns.append(normalize_column_name(col))
     df.columns = cleaned_columns
     return df.dropna(how='all')
 
 
 def dynamic_column_matching(df, column_mapper):
-    column_mapping = column_mapper.get_mapping()
-    matched = {}
-    for target, aliases in column_mapping.items():
-        found = False
-        for col in df.columns:
-            col_clean = re.sub(r'[\s：()（）\n\t]', '', str(col)).strip()
-            for alias in aliases:
-                alias_clean = re.sub(r'[\s：()（）\n\t]', '', str(alias)).strip()
-                if col_clean == alias_clean:
-                    matched[target] = col
-                    found = True
-                    break
-            if found:
-                break
-    return matched
+    return column_mapper.resolve(df.columns)
+
+
+def product_keys(products):
+    """产品线归一化键（去空白、小写）；只对不同取值各计算一次。"""
+    codes, uniques = pd.factorize(products, use_na_sentinel=False)
+    keys = pd.Index(uniques).astype(str).str.strip().str.lower()
+    return pd.Series(keys.take(codes), index=products.index)
+
+
+def contact_lookup(products, product_contact_list, first_wins=False):
+    """一次查表得到每行的新对接人，未匹配的行为 NaN。
+
+    产品线重复时 overwrite 取最后一条、fill_empty（first_wins）取第一条，与逐条套用的结果一致。
+    """
+    lookup = {}
+    for product, contact in product_contact_list:
+        key = str(product).strip().lower()
+        if first_wins:
+            lookup.setdefault(key, contact)
+        else:
+            lookup[key] = contact
+    return product_keys(products).map(lookup)
+
+
+def _is_text(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def categorize(df, max_ratio=CATEGORY_MAX_RATIO):
+    """把低基数的文本列就地转为 category；发起时间等时间列保留原样供日期解析。"""
+    limit = len(df) * max_ratio
+    for col in df.columns:
+        if any(keyword in str(col) for keyword in dates_core.TIME_COLUMN_KEYWORDS):
+            continue
+        series = df[col]
+        if _is_text(series) and series.nunique() <= limit:
+            df[col] = series.astype('category')
+    return df
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except Exception:
+        raise Exception("字符串 Arrow 存储需要安装 pyarrow")
+
+
+def to_arrow_strings(df):
+    """把纯文本的 object 列就地转为 string[pyarrow]；数字与文本混杂的列保持不变，以免改变输出类型。"""
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+            df[col] = series.astype(ARROW_STRING_DTYPE)
+    return df
+
+
+def compact(df, arrow_strings=False):
+    """读入后压缩存储：低基数文本列转 category，arrow_strings 时其余纯文本列转 string[pyarrow]。"""
+    categorize(df)
+    if arrow_strings:
+        to_arrow_strings(df)
+    return df
+
+
+def concat_frames(frames, max_ratio=CATEGORY_MAX_RATIO):
+    """合并各工作表：category 列先统一为各表取值的并集，避免合并后退化为 object。
+
+    并集仍满足基数比例的列在全部表中使用同一 CategoricalDtype，否则恢复为 object。
+    """
+    total = sum(len(df) for df in frames)
+    columns = []
+    for df in frames:
+        columns += [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype) and col not in columns]
+    dtypes = {}
+    for col in columns:
+        values = [df[col].cat.categories if isinstance(df[col].dtype, pd.CategoricalDtype) else pd.Index(df[col].dropna().unique()) for df in frames if col in df.columns]
+        union = values[0].append(values[1:]).unique()
+        dtype = pd.CategoricalDtype(union) if len(union) <= total * max_ratio else object
+        dtypes[col] = dtype
+        for df in frames:
+            if col in df.columns and df[col].dtype != dtype:
+                df[col] = df[col].astype(dtype)
+    combined = pd.concat(frames, ignore_index=True)
+    for col, dtype in dtypes.items():
+        if combined[col].dtype != dtype:
+            combined[col] = combined[col].astype(dtype)
+    return combined
+
+
+def assign(df, column, mask, values):
+    """df.loc[mask, column] = values；category 列先补上尚不存在的取值。"""
+    if isinstance(mask, pd.Series) and mask.dtype == 'boolean':
+        # string[pyarrow] 列比较得到的可空布尔掩码，缺失值视为不匹配
+        mask = mask.fillna(False).astype(bool)
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        incoming = pd.Index(values if isinstance(values, pd.Series) else [values]).dropna().unique()
+        missing = incoming[~incoming.isin(series.cat.categories)]
+        if len(missing):
+            df[column] = series.cat.add_categories(missing)
+    df.loc[mask, column] = values
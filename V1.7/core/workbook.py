@@ -0,0 +1,60 @@
+import pandas as pd
+
+
+class WorkbookSession:
+    """工作簿会话。
+
+    文件只打开并解析一次，工作表探测与整表读取共享同一个已解析句柄。
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._excel_file = pd.ExcelFile(file_path)
+
+    @property
+    def sheet_names(self):
+        return self._excel_file.sheet_names
+
+    def probe(self, sheet_name, nrows=10):
+        return self._excel_file.parse(sheet_name=sheet_name, nrows=nrows)
+
+    def read_sheet(self, sheet_name, **kwargs):
+        return self._excel_file.parse(sheet_name=sheet_name, **kwargs)
+
+    @property
+    def streamable(self):
+        """是否支持逐行流式读取（xlsx 由 openpyxl 打开）。"""
+        return hasattr(self._excel_file.book, 'worksheets')
+
+    def iter_rows(self, sheet_name):
+        """逐行迭代工作表原始值，xlsx 走 openpyxl 只读流式读取。"""
+        if self.streamable:
+            sheet = self._excel_file.book[sheet_name]
+            # 与 pandas 一致：忽略文件中可能不准确的尺寸声明
+            if hasattr(sheet, 'reset_dimensions'):
+                sheet.reset_dimensions()
+            yield from sheet.iter_rows(values_only=True)
+            return
+        df = self._excel_file.parse(sheet_name=sheet_name, header=None)
+        for row in df.itertuples(index=False, name=None):
+            yield tuple(None if pd.isna(v) else v for v in row)
+
+    def close(self):
+        try:
+            self._excel_file.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_workbook(source):
+    """返回 (session, owned)；传入已有会话时复用，不负责关闭。"""
+    if isinstance(source, WorkbookSession):
+        return source, False
+    return WorkbookSession(source), True
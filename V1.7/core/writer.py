@@ -0,0 +1,245 @@
+import os
+import time
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
+from core import cancel as cancel_core
+from core import report as report_core
+
+RESULT_SHEET = '处理结果'
+MAX_COLUMN_WIDTH = 50
+RESULT_ALIGNMENT = Alignment(wrap_text=True, vertical='center', horizontal='left')
+DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+# 写出过程中检查取消的行间隔
+CANCEL_CHECK_ROWS = 100
+# openpyxl 常规模式中创建单元格约占写出耗时的 30%，其余为保存时的序列化
+OPENPYXL_BUILD_SHARE = 0.3
+
+OUTPUT_FORMATS = {
+    'xlsx': '.xlsx',
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+
+def column_widths(df):
+    """按 DataFrame 向量化计算列宽（表头与单元格文本的最大长度 + 2，上限 50）。"""
+    widths = []
+    for i, col in enumerate(df.columns):
+        # 字符串类型的缺失值转换后仍为缺失，按空单元格计
+        lengths = df.iloc[:, i].astype(str).str.len().fillna(0)
+        longest = max(len(str(col)), int(lengths.max()) if len(lengths) else 0)
+        widths.append(min(longest + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def excel_engine(engine=None):
+    """未指定时使用只写模式：内存占用不随行数增长（写出速度与常规模式相近，略慢）；'openpyxl' 需显式指定。"""
+    return engine or 'write_only'
+
+
+def write_excel(df, output_file, sheet_name=RESULT_SHEET, engine=None, cancel_event=None, report=None, progress=None):
+    """写出结果表。engine: 'write_only'（流式只写，默认）或 'openpyxl'（常规模式）。"""
+    engine = excel_engine(engine)
+    if engine == 'write_only':
+        return write_excel_write_only(df, output_file, sheet_name, cancel_event=cancel_event, report=report, progress=progress)
+    return write_excel_openpyxl(df, output_file, sheet_name, cancel_event=cancel_event, report=report, progress=progress)
+
+
+def write_excel_openpyxl(df, output_file, sheet_name=RESULT_SHEET, chunk_size=10000, cancel_event=None, report=None, progress=None):
+    """openpyxl 常规模式：与只写模式一样按列复用样式模板，新建单元格时直接带上样式，不再逐格重设对齐。"""
+    with report_core.stage(report, 'format', rows_in=len(df)):
+        widths = column_widths(df)
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = sheet_name
+    for i, width in enumerate(widths, start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = width
+    header = _styled_cell(worksheet)
+    cells = _cell_templates(worksheet, df)
+    worksheet.append([Cell(worksheet, value=str(col), style_array=header._style) for col in df.columns])
+    started = time.perf_counter()
+    with report_core.stage(report, 'write', 'openpyxl', rows_in=len(df)):
+        for n, values in enumerate(_iter_rows(df, chunk_size)):
+            if n % CANCEL_CHECK_ROWS == 0:
+                cancel_core.check_cancelled(cancel_event)
+                if progress is not None:
+                    progress.rows_written(n * OPENPYXL_BUILD_SHARE)
+            worksheet.append([Cell(worksheet, value=value, style_array=cell._style) for cell, value in zip(cells, values)])
+    cancel_core.check_cancelled(cancel_event)
+    on_poll = None
+    if progress is not None:
+        # 保存期间无法逐行上报：按创建单元格的实测耗时外推保存耗时，按经过时间推进（最多到 95%）
+        built = time.perf_counter()
+        expected = max(built - started, 0.01) * (1 - OPENPYXL_BUILD_SHARE) / OPENPYXL_BUILD_SHARE
+        def on_poll():
+            share = min((time.perf_counter() - built) / expected, 0.95)
+            progress.rows_written(len(df) * (OPENPYXL_BUILD_SHARE + (1 - OPENPYXL_BUILD_SHARE) * share))
+    with report_core.stage(report, 'save'):
+        # 常规模式保存时才序列化全部单元格，耗时较长：放到后台线程，取消时立即返回，保存结束后删除文件
+        cancel_core.run_cancellable(lambda: workbook.save(output_file), cancel_event, cleanup=lambda _: _discard(output_file), on_poll=on_poll)
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _styled_cell(worksheet, number_format=None):
+    cell = WriteOnlyCell(worksheet)
+    cell.alignment = RESULT_ALIGNMENT
+    if number_format:
+        cell.number_format = number_format
+    return cell
+
+
+def _cell_templates(worksheet, df):
+    """各列数据单元格的样式模板；日期时间列带数字格式。"""
+    return [
+        _styled_cell(worksheet, DATETIME_FORMAT if pd.api.types.is_datetime64_any_dtype(df.iloc[:, i]) else None)
+        for i in range(len(df.columns))
+    ]
+
+
+def _iter_rows(df, chunk_size):
+    """按 chunk_size 分块转换为 Python 对象后逐行产出，缺失值为 None，避免整表对象化。"""
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def write_excel_write_only(df, output_file, sheet_name=RESULT_SHEET, chunk_size=10000, cancel_event=None, report=None, progress=None):
+    """openpyxl 只写模式：逐行直接序列化到磁盘，格式与常规模式一致。
+
+    每列复用一个带样式的单元格模板，按 chunk_size 分块转换数据，避免整表对象化。
+    """
+    with report_core.stage(report, 'format', rows_in=len(df)):
+        widths = column_widths(df)
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    for i, width in enumerate(widths, start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = width
+    cells = _cell_templates(worksheet, df)
+    # 混合类型（object）列每行新建单元格：模板被复用，写入日期时间会就地改写其数字格式，波及已写出的行
+    mixed = [i for i, dtype in enumerate(df.dtypes) if dtype == object]
+    plain = [i for i in range(len(cells)) if i not in mixed]
+    header = []
+    for col in df.columns:
+        cell = _styled_cell(worksheet)
+        cell.value = str(col)
+        header.append(cell)
+    worksheet.append(header)
+    try:
+        with report_core.stage(report, 'write', 'write_only', rows_in=len(df)):
+            for n, values in enumerate(_iter_rows(df, chunk_size)):
+                if n % CANCEL_CHECK_ROWS == 0:
+                    cancel_core.check_cancelled(cancel_event)
+                    if progress is not None:
+                        progress.rows_written(n)
+                row = list(cells) if mixed else cells
+                for i in plain:
+                    cells[i].value = values[i]
+                for i in mixed:
+                    row[i] = Cell(worksheet, row=1, column=1, value=values[i], style_array=cells[i]._style)
+                worksheet.append(row)
+        cancel_core.check_cancelled(cancel_event)
+    except cancel_core.ProcessCancelled:
+        # 关闭只写工作表，释放其临时文件
+        try:
+            worksheet.close()
+        except Exception:
+            pass
+        raise
+    with report_core.stage(report, 'save'):
+        workbook.save(output_file)
+
+
+def write_csv(df, output_file, cancel_event=None, chunk_size=10000, progress=None):
+    """UTF-8 BOM 编码写出 CSV；传入 cancel_event 或 progress 时分块追加，块之间检查取消并上报进度。"""
+    if cancel_event is None and progress is None:
+        df.to_csv(output_file, index=False, encoding='utf-8-sig')
+        return
+    df.iloc[:0].to_csv(output_file, index=False, encoding='utf-8-sig')
+    for start in range(0, len(df), chunk_size):
+        cancel_core.check_cancelled(cancel_event)
+        if progress is not None:
+            progress.rows_written(start)
+        df.iloc[start:start + chunk_size].to_csv(output_file, index=False, header=False, mode='a', encoding='utf-8')
+
+
+def detect_format(output_file, output_format=None):
+    if output_format:
+        fmt = str(output_format).lower().lstrip('.')
+        if fmt not in OUTPUT_FORMATS:
+            raise Exception(f"不支持的输出格式: {output_format}")
+        return fmt
+    ext = os.path.splitext(str(output_file))[1].lower()
+    for fmt, fmt_ext in OUTPUT_FORMATS.items():
+        if ext == fmt_ext:
+            return fmt
+    return 'xlsx'
+
+
+def output_path(output_file, output_format=None):
+    """返回实际写出的路径：显式指定格式时替换为对应扩展名。"""
+    fmt = detect_format(output_file, output_format)
+    root, ext = os.path.splitext(str(output_file))
+    if ext.lower() == OUTPUT_FORMATS[fmt]:
+        return str(output_file)
+    return root + OUTPUT_FORMATS[fmt]
+
+
+def _columnar_frame(df):
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # category 只是内存优化（是否转换取决于行数），写出时恢复为原取值类型，保证输出结构稳定
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def write_output(df, output_file, output_format=None, engine=None, cancel_event=None, report=None, progress=None):
+    """按格式写出结果：xlsx（默认）、csv（UTF-8 BOM）、parquet、feather，列顺序与 df 一致。
+
+    先写入同目录临时文件，成功后再替换目标文件；取消（抛出 ProcessCancelled）或出错时
+    删除临时文件，不会留下写了一半的结果。
+    """
+    fmt = detect_format(output_file, output_format)
+    path = output_path(output_file, output_format)
+    if fmt in ('parquet', 'feather'):
+        try:
+            import pyarrow  # noqa: F401
+        except Exception:
+            raise Exception(f"输出 {fmt} 格式需要安装 pyarrow")
+    cancel_core.check_cancelled(cancel_event)
+    if progress is not None:
+        progress.plan_write(len(df), excel_engine(engine) if fmt == 'xlsx' else fmt)
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.part{ext}"
+    try:
+        if fmt == 'xlsx':
+            write_excel(df, tmp_path, engine=engine, cancel_event=cancel_event, report=report, progress=progress)
+        else:
+            with report_core.stage(report, 'write', fmt, rows_in=len(df)):
+                if fmt == 'csv':
+                    write_csv(df, tmp_path, cancel_event=cancel_event, progress=progress)
+                elif fmt == 'parquet':
+                    _columnar_frame(df).to_parquet(tmp_path, index=False)
+                else:
+                    _columnar_frame(df).to_feather(tmp_path)
+        cancel_core.check_cancelled(cancel_event)
+        os.replace(tmp_path, path)
+        if progress is not None:
+            progress.complete('write')
+    except BaseException:
+        _discard(tmp_path)
+        raise
+    return path
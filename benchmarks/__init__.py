@@ -0,0 +1,5 @@
+"""
+Benchmark suite: synthetic Feishu-style workbooks and timing of the core pipeline.
+
+Run with ``python -m benchmarks --help``.
+"""
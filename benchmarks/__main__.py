@@ -0,0 +1,72 @@
+"""命令行入口::
+
+    python -m benchmarks --sizes 1k,10k -o bench.json                  # 生成并计时
+    python -m benchmarks --sizes 1k,10k -o after.json --compare bench.json
+    python -m benchmarks --sizes 100k --writers xlsx_write_only,csv --repeat 3
+"""
+
+import argparse
+import sys
+
+from benchmarks import bench
+from benchmarks import synthetic
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Excel2Ding 基准测试')
+    parser.add_argument('--sizes', default='1k,10k', help=f"逗号分隔的规模：{','.join(synthetic.SIZES)} 或行数，默认 1k,10k")
+    parser.add_argument('--sheets', type=int, help='工作表数（1-20），默认按规模取值')
+    parser.add_argument('--writers', help=f"逗号分隔的写出方式：{','.join(bench.WRITERS)}，默认全部")
+    parser.add_argument('--repeat', type=int, default=1, help='每项重复次数，取最小值对比')
+    parser.add_argument('--alias-variant', type=int, default=0, help='表头使用第几个列名别名（0 为标准列名）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--workdir', help='合成工作簿缓存目录，默认系统临时目录下 e2d_bench')
+    parser.add_argument('-o', '--output', default='bench_results.json', help='结果 JSON 路径')
+    parser.add_argument('--compare', help='与之对比的基线结果 JSON')
+    parser.add_argument('--threshold', type=float, default=0.10, help='判定退化的变慢比例，默认 0.10')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.sheets is not None and not 1 <= args.sheets <= 20:
+        parser.error("--sheets 取值范围为 1-20")
+    writers = [w.strip() for w in args.writers.split(',')] if args.writers else None
+    for name in writers or []:
+        if name not in bench.WRITERS:
+            parser.error(f"未知写出方式: {name}")
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    data = bench.run_suite(
+        sizes,
+        sheets=args.sheets,
+        writers=writers,
+        repeat=args.repeat,
+        workdir=args.workdir,
+        seed=args.seed,
+        alias_variant=args.alias_variant,
+        progress=lambda message: print(message, file=sys.stderr),
+    )
+    bench.save(data, args.output)
+    for entry in data['results']:
+        print(f"{entry['size']:>6} 行数 {entry['rows']:>8} 表 {entry['sheets']:>2}  "
+              f"探测 {entry['get_sheets_with_data']['min']:.3f}s  处理 {entry['process_raw_excel']['min']:.3f}s")
+        for name, writer in entry['writers'].items():
+            if 'min' in writer:
+                print(f"{'':>8}写出 {name:<16}{writer['min']:.3f}s")
+            else:
+                print(f"{'':>8}写出 {name:<16}跳过: {writer['skipped']}")
+    print(f"结果已保存: {args.output}")
+    if not args.compare:
+        return 0
+    rows = bench.compare(bench.load(args.compare), data, threshold=args.threshold)
+    regressed = False
+    for size, metric, before, after, change, worse in rows:
+        flag = '  <-- 退化' if worse else ''
+        print(f"{size:>6} {metric:<32}{before:>9.3f}s{after:>9.3f}s{change:>+9.1%}{flag}")
+        regressed = regressed or worse
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""基准测试：计时工作表探测、完整处理流程与各输出写出方式，结果保存为 JSON 便于前后对比。"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+
+from benchmarks import synthetic
+from core import report as report_core
+from core import writer as writer_core
+from core.process_impl import build_output_frame, get_sheets_with_data, process_raw_excel
+
+# 写出方式名称 -> (输出格式, xlsx 引擎)
+WRITERS = {
+    'xlsx_openpyxl': ('xlsx', 'openpyxl'),
+    'xlsx_write_only': ('xlsx', 'write_only'),
+    'csv': ('csv', None),
+    'parquet': ('parquet', None),
+    'feather': ('feather', None),
+}
+
+# 完整处理时筛选的日期范围（一个季度）与产品线映射
+BENCH_START = datetime(2025, 1, 1)
+BENCH_END = datetime(2025, 3, 31)
+BENCH_MAPPINGS = [('电子纸', '张三'), ('会议系统', '李四')]
+
+
+def _timed(func, repeat=1):
+    """执行 repeat 次，返回 (耗时列表, 最后一次返回值)。"""
+    durations = []
+    result = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - started)
+    return durations, result
+
+
+def _summary(durations):
+    return {'min': min(durations), 'median': statistics.median(durations), 'runs': len(durations)}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def environment():
+    try:
+        import pyarrow
+        arrow_version = pyarrow.__version__
+    except Exception:
+        arrow_version = None
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'openpyxl': openpyxl.__version__,
+        'pyarrow': arrow_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def bench_workbook(path, outdir, writers=None, repeat=1):
+    """对单个工作簿计时，返回结果 dict。"""
+    result = {}
+    durations, sheets = _timed(lambda: get_sheets_with_data(path), repeat=max(repeat, 3))
+    result['get_sheets_with_data'] = _summary(durations)
+    result['sheets_detected'] = len(sheets)
+
+    reports = []
+
+    def run_process():
+        report = report_core.RunReport()
+        process_raw_excel(path, os.path.join(outdir, 'process.xlsx'), BENCH_START, BENCH_END, product_contact_list=BENCH_MAPPINGS, report=report)
+        reports.append(report)
+
+    durations, _ = _timed(run_process, repeat)
+    result['process_raw_excel'] = _summary(durations)
+    result['process_raw_excel']['rows_in'] = reports[-1].rows_in
+    result['process_raw_excel']['rows_out'] = reports[-1].rows_out
+    result['process_raw_excel']['stages'] = [
+        {'name': s.name, 'detail': s.detail, 'wall': s.wall, 'cpu': s.cpu, 'rss_delta': s.rss_delta}
+        for s in reports[-1].stages
+    ]
+
+    # 写出基准使用不筛选日期的完整结果表
+    frame = build_output_frame(path, product_contact_list=BENCH_MAPPINGS)
+    result['writers'] = {}
+    for name in writers or WRITERS:
+        fmt, engine = WRITERS[name]
+        target = os.path.join(outdir, f"writer_{name}")
+        try:
+            durations, written = _timed(lambda: writer_core.write_output(frame, target, fmt, engine=engine), repeat)
+            entry = _summary(durations)
+            entry['rows'] = len(frame)
+            entry['bytes'] = os.path.getsize(written)
+        except Exception as e:
+            entry = {'skipped': str(e)}
+        result['writers'][name] = entry
+    return result
+
+
+def run_suite(sizes, sheets=None, writers=None, repeat=1, workdir=None, seed=0, alias_variant=0, progress=None):
+    """按规模列表依次生成（或复用）工作簿并计时，返回可直接保存为 JSON 的结果。"""
+    workdir = workdir or os.path.join(tempfile.gettempdir(), 'e2d_bench')
+    results = []
+    for size in sizes:
+        rows = synthetic.parse_size(size)
+        sheet_count = sheets or synthetic.SIZES.get(str(size).lower(), (rows, 1))[1]
+        if progress:
+            progress(f"生成/复用工作簿: {rows} 行, {sheet_count} 个工作表")
+        started = time.perf_counter()
+        path = synthetic.workbook_for(workdir, rows, sheet_count, seed, alias_variant)
+        generate_time = time.perf_counter() - started
+        if progress:
+            progress(f"计时: {os.path.basename(path)}")
+        with tempfile.TemporaryDirectory(prefix='e2d_bench_out_') as outdir:
+            entry = bench_workbook(path, outdir, writers, repeat)
+        entry.update({'size': str(size), 'rows': rows, 'sheets': sheet_count, 'file_bytes': os.path.getsize(path), 'generate_time': generate_time})
+        results.append(entry)
+    return {'environment': environment(), 'results': results}
+
+
+def _metrics(data):
+    """展开为 (规模, 指标名) -> 秒数，用于对比。"""
+    metrics = {}
+    for entry in data.get('results', []):
+        size = entry.get('size')
+        for key in ('get_sheets_with_data', 'process_raw_excel'):
+            if 'min' in entry.get(key, {}):
+                metrics[(size, key)] = entry[key]['min']
+        for stage in entry.get('process_raw_excel', {}).get('stages', []):
+            name = f"stage:{stage['name']}" + (f":{stage['detail']}" if stage.get('detail') else "")
+            metrics[(size, name)] = metrics.get((size, name), 0.0) + stage['wall']
+        for name, writer in entry.get('writers', {}).items():
+            if 'min' in writer:
+                metrics[(size, f"writer:{name}")] = writer['min']
+    return metrics
+
+
+def compare(baseline, current, threshold=0.10, min_seconds=0.05):
+    """对比两次结果，返回 [(规模, 指标, 基线秒数, 当前秒数, 变化比例, 是否退化)]。
+
+    变慢超过 threshold 且绝对增加超过 min_seconds 才算退化，避免毫秒级阶段的噪声。
+    """
+    old = _metrics(baseline)
+    new = _metrics(current)
+    rows = []
+    for key in new:
+        if key not in old:
+            continue
+        before, after = old[key], new[key]
+        change = (after - before) / before if before else 0.0
+        rows.append(key + (before, after, change, change > threshold and after - before > min_seconds))
+    return rows
+
+
+def save(data, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,118 @@
+"""合成飞书审批导出工作簿：第 1 行为导出说明，第 2 行为表头，数据从第 3 行开始。
+
+表头取自 ColumnMapper.DEFAULT_MAPPING 的别名（同一文件内各表一致，alias_variant
+选择第几个别名），发起时间的格式按工作表轮换（文本、日期单元格、Excel 序列号、逐行混合）。
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+
+from core.mapping import ColumnMapper
+
+# 规模名称 -> (总行数, 工作表数)
+SIZES = {
+    '1k': (1000, 1),
+    '10k': (10000, 3),
+    '100k': (100000, 8),
+    '1m': (1000000, 20),
+}
+
+DATE_STYLES = ['text', 'datetime', 'serial', 'mixed']
+PRODUCTS = ['电子纸', '会议系统', '商显', '教育平板', '车载屏', '医疗显示', '工控屏', '拼接屏']
+DEPARTMENTS = ['华东销售部', '华南销售部', '华北销售部', '海外销售部', '大客户部']
+STATUSES = ['审批中', '已通过', '已拒绝', '已撤回']
+EXTRA_COLUMNS = ['审批编号', '备注']
+
+_BASE_TIME = datetime(2025, 1, 1)
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+def parse_size(text):
+    """'10k' / '1m' / '2500' -> 行数。"""
+    text = str(text).strip().lower()
+    if text in SIZES:
+        return SIZES[text][0]
+    if text.endswith('k'):
+        return int(float(text[:-1]) * 1000)
+    if text.endswith('m'):
+        return int(float(text[:-1]) * 1000000)
+    return int(text)
+
+
+def sheet_headers(alias_variant=0):
+    """表头：每个目标列取第 alias_variant 个别名（不足时取最后一个），附加无关列。"""
+    headers = []
+    for target, aliases in ColumnMapper.DEFAULT_MAPPING.items():
+        if target == '当前周':
+            continue
+        headers.append(aliases[min(alias_variant, len(aliases) - 1)])
+    return headers + EXTRA_COLUMNS
+
+
+def _time_value(moment, style, rng):
+    if style == 'mixed':
+        style = rng.choice(['text', 'datetime', 'serial', 'slash'])
+    if style == 'text':
+        return moment.strftime('%Y-%m-%d %H:%M:%S')
+    if style == 'slash':
+        return moment.strftime('%Y/%m/%d %H:%M')
+    if style == 'serial':
+        return (moment - _EXCEL_EPOCH).total_seconds() / 86400
+    return moment
+
+
+def _row(i, moment, time_value, rng):
+    values = {
+        '发起人姓名': f"员工{rng.randint(1, 200)}",
+        '发起时间': time_value,
+        '项目名称': f"项目{i}",
+        '产品线': rng.choice(PRODUCTS),
+        '申请状态': rng.choice(STATUSES),
+        '特制化比例': rng.randint(0, 100),
+        '可常规化比例': rng.randint(0, 100),
+        '建议报价元': round(rng.uniform(100, 100000), 2),
+        '定制内容': '定制需求说明' * rng.randint(1, 12),
+        '软件版本': f"V{rng.randint(1, 5)}.{rng.randint(0, 9)}",
+        '硬件情况': rng.choice(['1920x1080', '3840x2160', '1280x800']),
+        '销售部门': rng.choice(DEPARTMENTS),
+        '定制人': f"经理{rng.randint(1, 30)}",
+    }
+    row = [values[target] for target in ColumnMapper.DEFAULT_MAPPING if target != '当前周']
+    return row + [f"SP{moment:%Y%m%d}{i:07d}", '' if rng.random() < 0.8 else '加急']
+
+
+def make_workbook(path, rows, sheets=1, seed=0, alias_variant=0):
+    """生成 rows 行、平均分布在 sheets 个工作表中的导出文件，另附一个空白说明表。"""
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    per_sheet = [rows // sheets + (1 if s < rows % sheets else 0) for s in range(sheets)]
+    counter = 0
+    for s, count in enumerate(per_sheet):
+        worksheet = workbook.create_sheet(f"部门{s + 1}")
+        worksheet.append([f"审批导出 {_BASE_TIME:%Y-%m-%d}，共 {count} 条"])
+        worksheet.append(sheet_headers(alias_variant))
+        style = DATE_STYLES[s % len(DATE_STYLES)]
+        for _ in range(count):
+            moment = _BASE_TIME + timedelta(seconds=rng.randint(0, 365 * 86400))
+            # 约 1% 的记录缺少发起时间
+            time_value = None if rng.random() < 0.01 else _time_value(moment, style, rng)
+            worksheet.append(_row(counter, moment, time_value, rng))
+            counter += 1
+    notes = workbook.create_sheet('说明')
+    notes.append(['本文件为基准测试生成的合成数据'])
+    workbook.save(path)
+    return path
+
+
+def workbook_for(workdir, rows, sheets, seed=0, alias_variant=0):
+    """返回对应规模的工作簿路径，已生成过则直接复用。"""
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f"feishu_{rows}_{sheets}s_{seed}_a{alias_variant}.xlsx")
+    if not os.path.exists(path):
+        tmp_path = path + '.part.xlsx'
+        make_workbook(tmp_path, rows, sheets, seed, alias_variant)
+        os.replace(tmp_path, path)
+    return path
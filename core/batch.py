@@ -0,0 +1,145 @@
+import glob
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import pandas as pd
+
+from core.processing import ExcelProcessor
+from core.process_impl import build_output_frame, process_raw_excel
+from core import writer as writer_core
+from core import report as report_core
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+
+@dataclass
+class FileSummary:
+    input_file: str
+    output_file: str = ""
+    rows_in: int = 0
+    rows_kept: int = 0
+    duration: float = 0.0
+    error: str = ""
+    report: report_core.RunReport = None
+
+    @property
+    def ok(self):
+        return not self.error
+
+
+def expand_inputs(source):
+    """目录、通配符或单个文件展开为输入文件列表（忽略 Excel 临时文件 ~$*）。"""
+    sources = [source] if isinstance(source, (str, os.PathLike)) else list(source)
+    files = []
+    for item in sources:
+        item = str(item)
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        elif glob.has_magic(item):
+            candidates = glob.glob(item)
+        else:
+            candidates = [item]
+        for path in sorted(candidates):
+            name = os.path.basename(path)
+            if name.startswith('~$') or not name.lower().endswith(EXCEL_EXTENSIONS):
+                continue
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def _output_for(input_file, output_dir, output_format):
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    ext = writer_core.OUTPUT_FORMATS[writer_core.detect_format('', output_format)]
+    return os.path.join(output_dir or os.path.dirname(input_file), f"{stem}_处理结果{ext}")
+
+
+def _process_one(input_file, output_file, options):
+    summary = FileSummary(input_file, report=report_core.RunReport())
+    started = time.perf_counter()
+    try:
+        options = dict(options)
+        start_date = options.pop('start_date', None)
+        end_date = options.pop('end_date', None)
+        product_contact_list = options.pop('product_contact_list', None)
+        processor = ExcelProcessor(process_raw_excel)
+        ok = processor.process(input_file, output_file, start_date, end_date, product_contact_list, report=summary.report, **options)
+        if ok:
+            summary.output_file = writer_core.output_path(output_file, options.get('output_format'))
+        else:
+            summary.error = "处理已取消"
+    except Exception as e:
+        summary.error = str(e)
+    summary.rows_in = summary.report.rows_in
+    summary.rows_kept = summary.report.rows_out
+    summary.duration = time.perf_counter() - started
+    return summary
+
+
+def _build_one(input_file, options):
+    summary = FileSummary(input_file, report=report_core.RunReport(input_file=str(input_file)))
+    started = time.perf_counter()
+    output_df = None
+    try:
+        output_df = build_output_frame(input_file, report=summary.report, **options)
+        if output_df is None:
+            summary.error = "处理已取消"
+    except Exception as e:
+        summary.error = str(e)
+    summary.rows_in = summary.report.rows_in
+    summary.rows_kept = summary.report.rows_out
+    summary.duration = time.perf_counter() - started
+    return summary, output_df
+
+
+def process_batch(inputs, output_dir=None, start_date=None, end_date=None, product_contact_list=None, replace_mode='overwrite', max_workers=None, merge_output=None, output_format=None, **options):
+    """并发处理多个导出文件，返回每个文件的 FileSummary 列表（顺序与输入一致）。
+
+    merge_output 为文件路径时，所有结果合并按发起时间倒序写入该文件；否则每个输入写出一个结果文件。
+    max_workers 限制同时处理的文件数，默认 CPU 核数。
+    report_json 为 True 时在各结果文件旁写出运行报告；合并模式下写出一个包含全部文件报告的 JSON。
+    """
+    files = expand_inputs(inputs)
+    if not files:
+        raise Exception("未找到待处理的 Excel 文件")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    report_json = options.pop('report_json', False)
+    options = dict(options, start_date=start_date, end_date=end_date, product_contact_list=product_contact_list, replace_mode=replace_mode)
+    summaries = {}
+    frames = {}
+    with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(files))) as executor:
+        if merge_output:
+            futures = {executor.submit(_build_one, path, options): path for path in files}
+        else:
+            file_options = dict(options, output_format=output_format, report_json=report_json)
+            futures = {executor.submit(_process_one, path, _output_for(path, output_dir, output_format), file_options): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            if merge_output:
+                summary, output_df = future.result()
+                if output_df is not None and not summary.error:
+                    frames[path] = output_df
+            else:
+                summary = future.result()
+            summaries[path] = summary
+            logging.info("批处理 %s: rows_in=%s, rows_kept=%s, %.2fs %s", path, summary.rows_in, summary.rows_kept, summary.duration, summary.error)
+    if merge_output:
+        merged_path = writer_core.output_path(merge_output, output_format)
+        merged = [frames[path] for path in files if path in frames]
+        if merged:
+            merged_df = pd.concat(merged, ignore_index=True)
+            if '发起时间' in merged_df.columns:
+                merged_df = merged_df.sort_values(by='发起时间', ascending=False, na_position='last')
+            writer_core.write_output(merged_df, merge_output, output_format)
+        for path in frames:
+            summaries[path].output_file = merged_path
+            summaries[path].report.output_file = merged_path
+        if report_json:
+            with open(report_core.report_path(merged_path), 'w', encoding='utf-8') as f:
+                json.dump([summaries[path].report.to_dict() for path in files], f, ensure_ascii=False, indent=2)
+    return [summaries[path] for path in files]
@@ -0,0 +1,54 @@
+import queue
+import threading
+
+
+class BackgroundJob:
+    """后台任务运行器。
+
+    在工作线程中执行处理函数，进度与结果经线程安全队列传回，由界面线程定时 poll；
+    cancel() 设置 cancel_event，处理函数在检查点响应取消。
+    """
+
+    def __init__(self, target, *args, **kwargs):
+        self._target = target
+        self._args = args
+        self._kwargs = kwargs
+        self.cancel_event = threading.Event()
+        self._events = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="e2d-job", daemon=True)
+        self._thread.start()
+        return self
+
+    def _progress(self, percent, message):
+        self._events.put(('progress', percent, message))
+
+    def _run(self):
+        try:
+            result = self._target(*self._args, progress_callback=self._progress, cancel_event=self.cancel_event, **self._kwargs)
+            self._events.put(('done', result))
+        except Exception as e:
+            self._events.put(('error', e))
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self):
+        """取出当前积压的事件；多条进度只保留最新一条。"""
+        latest = None
+        finished = []
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'progress':
+                latest = event
+            else:
+                finished.append(event)
+        return ([latest] if latest else []) + finished
@@ -1,212 +1,432 @@
 import os
-import re
+import zipfile
 import pandas as pd
-from openpyxl.styles import Alignment
+from core import cancel as cancel_core
 from core import mapping as mapping_core
 from core import transform as transform_core
+from core import dates as dates_core
+from core import workbook as workbook_core
+from core import streaming as streaming_core
+from core import xlsx_probe
+from core import parallel as parallel_core
+from core import cache as cache_core
+from core import writer as writer_core
+from core import report as report_core
+from core import progress as progress_core
+from core import incremental as incremental_core
+
+
+def _looks_like_data_sheet(first_row, width):
+    if width < 5:
+        return False
+    header_keywords = ['时间', '日期', '申请', '审批', '金额', '报价', '产品', '类型']
+    first_row_text = ' '.join(str(v) for v in first_row).lower()
+    if any(keyword in first_row_text for keyword in header_keywords):
+        return True
+    return width >= 10
+
+
+def _probe_xlsx_headers(file_path):
+    sheets_with_data = []
+    for sheet_name, rows in xlsx_probe.probe_headers(file_path, nrows=2):
+        header_row, first_row = rows
+        if not first_row:
+            continue
+        width = max(len(header_row), len(first_row))
+        if _looks_like_data_sheet(first_row, width):
+            sheets_with_data.append(sheet_name)
+    return sheets_with_data
 
 
 def get_sheets_with_data(file_path):
+    path = file_path.file_path if isinstance(file_path, workbook_core.WorkbookSession) else file_path
+    try:
+        if isinstance(path, (str, os.PathLike)) and zipfile.is_zipfile(path):
+            return _probe_xlsx_headers(path)
+    except Exception:
+        pass
+    try:
+        session, owned = workbook_core.open_workbook(file_path)
+    except Exception:
+        return []
     try:
-        excel_file = pd.ExcelFile(file_path)
         sheets_with_data = []
-        for sheet_name in excel_file.sheet_names:
+        for sheet_name in session.sheet_names:
             try:
-                df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=10)
+                df = session.probe(sheet_name, nrows=10)
                 if not df.empty and len(df) > 0:
-                    first_row = df.iloc[0].astype(str)
-                    non_empty_count = first_row.count()
-                    if non_empty_count >= 5:
-                        header_keywords = ['时间', '日期', '申请', '审批', '金额', '报价', '产品', '类型']
-                        first_row_text = ' '.join(first_row.tolist()).lower()
-                        if any(keyword in first_row_text for keyword in header_keywords):
-                            sheets_with_data.append(sheet_name)
-                        elif len(df.columns) >= 10:
-                            sheets_with_data.append(sheet_name)
+                    if _looks_like_data_sheet(df.iloc[0].astype(str).tolist(), len(df.columns)):
+                        sheets_with_data.append(sheet_name)
             except Exception:
                 continue
         return sheets_with_data
     except Exception:
         return []
+    finally:
+        if owned:
+            session.close()
 
 
-def process_raw_excel(input_file, output_file, start_date=None, end_date=None, target_product=None, new_contact=None, product_contact_list=None, replace_mode='overwrite', progress_callback=None, cancel_event=None):
+def _load_sheets(session, sheet_names, progress, cancel_event=None, report=None, arrow_strings=False, start_date=None, end_date=None):
+    """逐表读取；给出日期范围时在每个表读取过程中解析并筛选，只保留范围内的行。"""
+    date_filter = streaming_core.DateRangeFilter(start_date, end_date, cancel_event) if start_date and end_date else None
+    all_data = []
+    for sheet_name in sheet_names:
+        if cancel_core.is_cancelled(cancel_event):
+            return None
+        try:
+            progress.stage(f"正在读取工作表: {sheet_name}")
+            with report_core.stage(report, 'read', sheet_name) as st:
+                if session.streamable and date_filter is not None:
+                    # 逐批筛选，内存只随保留的行增长
+                    df, st.rows_in = streaming_core.read_sheet_in_range(session, sheet_name, date_filter, cancel_event=cancel_event, progress=progress)
+                elif session.streamable:
+                    # 分批读取，读取单个大工作表时也能响应取消
+                    df = streaming_core.read_sheet(session, sheet_name, cancel_event=cancel_event, progress=progress)
+                    st.rows_in = len(df)
+                else:
+                    df = session.read_sheet(sheet_name, header=1, converters={'发起时间': str})
+                    df = transform_core.deep_clean_columns(df)
+                    st.rows_in = len(df)
+                    if date_filter is not None:
+                        df['数据来源'] = sheet_name
+                        df = date_filter.apply(df)
+                st.rows_out = len(df)
+            progress.sheet_loaded(df, st.rows_in)
+            df['数据来源'] = sheet_name
+            all_data.append(transform_core.compact(df, arrow_strings))
+        except cancel_core.ProcessCancelled:
+            return None
+        except Exception:
+            continue
+        finally:
+            progress.sheet_done(sheet_name)
+    return _finish_filter(all_data, date_filter, arrow_strings)
+
+
+def _finish_filter(all_data, date_filter, arrow_strings=False):
+    """全部工作表的时间都无法解析时，按行文本兜底筛选暂存的行并追加到结果中；取消时返回 None。"""
+    if date_filter is None or all_data is None:
+        return all_data
     try:
-        if progress_callback:
-            progress_callback(10, "正在分析文件结构...")
-        sheet_names = get_sheets_with_data(input_file)
-        if not sheet_names:
-            raise Exception("未找到包含数据的工作表")
-        if progress_callback:
-            progress_callback(20, f"发现 {len(sheet_names)} 个工作表: {sheet_names}")
-        all_data = []
-        for i, sheet_name in enumerate(sheet_names):
-            if cancel_event and getattr(cancel_event, 'is_set', None) and cancel_event.is_set():
-                return False
-            try:
-                if progress_callback:
-                    progress_callback(20 + i * 20 // len(sheet_names), f"正在读取工作表: {sheet_name}")
-                df = pd.read_excel(input_file, sheet_name=sheet_name, header=1, converters={'发起时间': str})
-                df = transform_core.deep_clean_columns(df)
-                df['数据来源'] = sheet_name
-                all_data.append(df)
-            except Exception:
-                continue
-        if not all_data:
-            raise Exception("未能读取任何工作表数据")
-        if progress_callback:
-            progress_callback(40, "合并所有工作表数据...")
-        if cancel_event and getattr(cancel_event, 'is_set', None) and cancel_event.is_set():
-            return False
-        combined_df = pd.concat(all_data, ignore_index=True)
-        if progress_callback:
-            progress_callback(50, f"数据合并完成，共 {len(combined_df)} 行记录")
-        if progress_callback:
-            progress_callback(60, "正在匹配列名...")
-        column_mapper = mapping_core.ColumnMapper()
-        matched = transform_core.dynamic_column_matching(combined_df, column_mapper)
+        tail = date_filter.finish()
+    except cancel_core.ProcessCancelled:
+        return None
+    if tail is not None:
+        all_data.append(transform_core.compact(tail, arrow_strings))
+    return all_data
+
+
+def _plan_workbook(input_file, progress):
+    """xlsx 按各工作表 XML 字节数规划读取进度。"""
+    try:
+        if isinstance(input_file, (str, os.PathLike)) and zipfile.is_zipfile(input_file):
+            progress.plan_workbook(*xlsx_probe.sheet_sizes(input_file))
+    except Exception:
+        pass
+
+
+def _open_session(input_file, progress, report=None, cancel_event=None):
+    """打开工作簿；xlsx 先按各工作表 XML 字节数规划读取进度。打开期间可取消（抛出 ProcessCancelled）。"""
+    _plan_workbook(input_file, progress)
+    with report_core.stage(report, 'open'):
+        session = cancel_core.run_cancellable(lambda: workbook_core.WorkbookSession(input_file), cancel_event, cleanup=lambda s: s.close())
+    progress.opened()
+    return session
+
+
+def _detect_sheets(source, progress, report=None):
+    """source 为 WorkbookSession 或文件路径（xlsx 按路径只读取各表表头，不解析整本工作簿）。"""
+    with report_core.stage(report, 'probe') as st:
+        sheet_names = get_sheets_with_data(source)
+        st.rows_out = len(sheet_names)
+    if not sheet_names:
+        raise Exception("未找到包含数据的工作表")
+    progress.plan_sheets(sheet_names)
+    progress.stage(f"发现 {len(sheet_names)} 个工作表: {sheet_names}")
+    return sheet_names
+
+
+def load_cleaned_sheets(input_file, cache=None, workers=None, progress_callback=None, cancel_event=None, report=None, arrow_strings=False, start_date=None, end_date=None):
+    """读取全部数据工作表并清洗合并；cache 命中时直接返回缓存结果，取消时返回 None。
+
+    arrow_strings 为 True 时纯文本列以 string[pyarrow] 存储（需要 pyarrow）。
+    未启用缓存且给出日期范围时，在各表读取时即解析日期并筛选（含 parsed_time 列），
+    只合并范围内的行；启用缓存时仍读取并缓存完整数据。
+    """
+    if arrow_strings:
+        transform_core.require_pyarrow()
+    progress = progress_core.ProgressTracker.wrap(progress_callback)
+    cache = cache_core.resolve_cache(cache)
+    if cache is not None:
+        start_date = end_date = None
+        with report_core.stage(report, 'cache', 'load') as st:
+            cached = cache.load(input_file)
+            st.rows_out = len(cached) if cached is not None else 0
+        if cached is not None:
+            progress.complete('read', "已从缓存加载工作表数据")
+            return transform_core.to_arrow_strings(cached) if arrow_strings else cached
+    sheet_names = None
+    if workers and workers > 1 and isinstance(input_file, (str, os.PathLike)):
+        # 并行读取时各进程自行打开文件：主进程只按路径探测工作表，不解析整本工作簿
+        _plan_workbook(input_file, progress)
+        sheet_names = _detect_sheets(input_file, progress, report)
+    if sheet_names is not None and len(sheet_names) > 1:
+        progress.opened()
+        with report_core.stage(report, 'read', f"{len(sheet_names)} 表并行") as st:
+            all_data = parallel_core.load_sheets_parallel(input_file, sheet_names, workers, progress, cancel_event, arrow_strings, start_date, end_date)
+            if all_data:
+                st.rows_in = sum(df.attrs.get('rows_read', len(df)) for df in all_data)
+            if all_data and start_date and end_date:
+                date_filter = streaming_core.DateRangeFilter(start_date, end_date, cancel_event)
+                for i, df in enumerate(all_data):
+                    if df.attrs.get('dates_found'):
+                        date_filter.note_found()
+                    else:
+                        all_data[i] = date_filter.apply(df, parsed=True)
+                all_data = _finish_filter(all_data, date_filter, arrow_strings)
+            st.rows_out = sum(len(df) for df in all_data or [])
+    else:
+        try:
+            session = _open_session(input_file, progress, report, cancel_event)
+        except cancel_core.ProcessCancelled:
+            return None
+        with session:
+            if sheet_names is None:
+                sheet_names = _detect_sheets(session, progress, report)
+            all_data = _load_sheets(session, sheet_names, progress, cancel_event, report, arrow_strings, start_date, end_date)
+    if all_data is None:
+        return None
+    if not all_data:
+        raise Exception("未能读取任何工作表数据")
+    progress.complete('read', "合并所有工作表数据...")
+    if cancel_core.is_cancelled(cancel_event):
+        return None
+    with report_core.stage(report, 'concat', rows_in=sum(len(df) for df in all_data)) as st:
+        combined_df = transform_core.concat_frames(all_data)
+        st.rows_out = len(combined_df)
+    if cache is not None:
+        with report_core.stage(report, 'cache', 'store', rows_in=len(combined_df)):
+            cache.store(input_file, combined_df)
+    return combined_df
+
+
+def build_output_frame(input_file, start_date=None, end_date=None, target_product=None, new_contact=None, product_contact_list=None, replace_mode='overwrite', progress_callback=None, cancel_event=None, streaming=False, batch_size=5000, workers=None, cache=None, report=None, state=None, arrow_strings=False):
+    """执行读取、筛选、映射与排序，返回待写出的结果 DataFrame；取消时返回 None。
+
+    report 为 RunReport 时记录各阶段耗时，并写入 rows_in（读取行数）与 rows_out（输出行数）。
+    state 为增量状态文件路径（或 RowStateStore）时读取完整数据，只对新增或变更的行做日期解析与组装，
+    其余行复用上次结果；日期范围在合并后筛选，处理完成后更新状态。
+    arrow_strings 为 True 时文本列以 string[pyarrow] 存储，降低长文本列的内存占用。
+    """
+    progress = progress_core.ProgressTracker.wrap(progress_callback)
+    store = incremental_core.resolve_state(state)
+    session = None
+    try:
+        progress.stage("正在分析文件结构...")
         if start_date and end_date:
-            if progress_callback:
-                progress_callback(70, f"筛选日期范围: {start_date} 至 {end_date}")
+            def output_ratio(sample):
+                parsed = dates_core.parse_time_column(sample, fallback=False)
+                return ((parsed >= start_date) & (parsed <= end_date)).mean()
+            progress.output_ratio = output_ratio
+        # 增量状态按行保存全部输入行，读取时不按日期预筛选
+        read_start, read_end = (None, None) if store is not None else (start_date, end_date)
+        if streaming:
+            if arrow_strings:
+                transform_core.require_pyarrow()
+            session = _open_session(input_file, progress, report, cancel_event)
+            sheet_names = _detect_sheets(session, progress, report)
+            combined_df = streaming_core.stream_sheets(session, sheet_names, read_start, read_end, batch_size=batch_size, cancel_event=cancel_event, progress=progress, report=report, arrow_strings=arrow_strings)
+        else:
+            combined_df = load_cleaned_sheets(input_file, cache, workers, progress, cancel_event, report, arrow_strings, read_start, read_end)
+        if combined_df is None:
+            return None
+        if report is not None:
+            report.rows_in = report.rows_read() or len(combined_df)
+        progress.complete('read')
+        progress.stage(f"数据合并完成，共 {len(combined_df)} 行记录")
+        progress.stage("正在匹配列名...")
+        with report_core.stage(report, 'column_match', rows_in=len(combined_df)):
+            column_mapper = mapping_core.ColumnMapper()
+            matched = transform_core.dynamic_column_matching(combined_df, column_mapper)
+        if store is not None:
+            with report_core.stage(report, 'state', 'load', rows_in=len(combined_df)) as st:
+                state_sig = incremental_core.signature(combined_df, column_mapper)
+                ident = incremental_core.row_identity(combined_df)
+                reused, is_new = incremental_core.split_rows(ident, store.load(state_sig))
+                st.rows_out = len(reused)
+            if len(reused):
+                combined_df = combined_df[is_new].copy()
+                progress.stage(f"增量处理：复用 {len(reused)} 行，新增或变更 {len(combined_df)} 行")
+        progress.plan_rows('transform', len(combined_df), progress_core.TRANSFORM_COST)
+        if start_date and end_date and store is None:
+            progress.stage(f"筛选日期范围: {start_date} 至 {end_date}")
             try:
-                time_columns = [col for col in combined_df.columns if '发起时间' in str(col)]
-                if time_columns:
-                    time_column = time_columns[0]
-                    combined_df['parsed_time'] = pd.to_datetime(combined_df[time_column].astype(str), errors='coerce')
-                    if combined_df['parsed_time'].isna().all():
-                        date_pattern = r'(\d{4}-\d{2}-\d{2})'
-                        def _extract_ymd(text):
-                            m = re.search(date_pattern, str(text))
-                            return m.group(1) if m else None
-                        combined_df['parsed_time'] = pd.to_datetime(combined_df[time_column].map(_extract_ymd), errors='coerce')
-                else:
-                    combined_df['parsed_time'] = pd.to_datetime(combined_df.get('发起时间', pd.Series([pd.NaT] * len(combined_df))).astype(str), errors='coerce')
-                if combined_df['parsed_time'].isna().all():
-                    date_any_pattern = re.compile(r'(\d{4}-\d{2}-\d{2}(?:\s+\d{2}:\d{2}:\d{2})?)')
-                    vals = []
-                    for _, row in combined_df.iterrows():
-                        text_line = ' '.join([str(v) for v in row.values])
-                        m = date_any_pattern.search(text_line)
-                        vals.append(m.group(1) if m else None)
-                    combined_df['parsed_time'] = pd.to_datetime(pd.Series(vals), errors='coerce')
-                mask = (combined_df['parsed_time'] >= start_date) & (combined_df['parsed_time'] <= end_date)
-                filtered_df = combined_df[mask]
-                if progress_callback:
-                    progress_callback(80, f"日期筛选完成，剩余 {len(filtered_df)} 行记录")
+                if 'parsed_time' not in combined_df.columns:
+                    with report_core.stage(report, 'date_parse', rows_in=len(combined_df)):
+                        combined_df['parsed_time'] = dates_core.parse_time_column(combined_df, cancel_event=cancel_event)
+                with report_core.stage(report, 'filter', rows_in=len(combined_df)) as st:
+                    mask = (combined_df['parsed_time'] >= start_date) & (combined_df['parsed_time'] <= end_date)
+                    filtered_df = combined_df[mask]
+                    st.rows_out = len(filtered_df)
+                progress.set_fraction('transform', 0.5, f"日期筛选完成，剩余 {len(filtered_df)} 行记录", force=True)
+            except cancel_core.ProcessCancelled:
+                raise
             except Exception:
                 filtered_df = combined_df
         else:
+            # 有日期范围时，整列无法解析才按行文本兜底；增量模式下需结合复用行判断
+            fallback = bool(start_date and end_date)
+            if store is not None and len(reused):
+                fallback = fallback and reused['parsed_time'].isna().all()
             if 'parsed_time' not in combined_df.columns:
-                time_columns = [col for col in combined_df.columns if '发起时间' in str(col)]
-                if time_columns:
-                    time_column = time_columns[0]
-                    combined_df['parsed_time'] = pd.to_datetime(combined_df[time_column].astype(str), errors='coerce')
-                else:
-                    combined_df['parsed_time'] = pd.Series([pd.NaT] * len(combined_df))
+                with report_core.stage(report, 'date_parse', rows_in=len(combined_df)):
+                    combined_df['parsed_time'] = dates_core.parse_time_column(combined_df, fallback=fallback, cancel_event=cancel_event)
             filtered_df = combined_df
-        if progress_callback:
-            progress_callback(90, "正在生成输出数据...")
-        filtered_df.loc[:, '当前周'] = filtered_df['parsed_time'].dt.isocalendar().week
+        progress.set_fraction('transform', 0.5, "正在生成输出数据...", force=True)
         desired_order = [
             '对接人（发起人）','发起时间','当前周','项目名称','产品线','当前进度','特制化比例(%)','可常规化比例(%)','建议报价(元)','定制内容','软件版本/产品名称','硬件情况（分辨率）/原产品主型号','销售部门','定制人/销售经理'
         ]
-        if cancel_event and getattr(cancel_event, 'is_set', None) and cancel_event.is_set():
-            return False
-        output_df = pd.DataFrame()
-        cm = column_mapper.get_output_columns()
-        rev_cm = {v: k for k, v in cm.items()}
-        alias_mappings = {
-            '对接人（发起人）': ['发起人姓名', '对接人'],
-            '发起时间': ['发起时间', '创建时间'],
-            '当前周': ['当前周'],
-            '项目名称': ['项目名称', '项目'],
-            '产品线': ['产品线', '产品'],
-            '当前进度': ['申请状态', '当前进度'],
-            '特制化比例(%)': ['特制化比例(%)', '特制化比例'],
-            '可常规化比例(%)': ['可常规化比例(%)', '可常规化比例'],
-            '建议报价(元)': ['建议报价(元)', '报价金额'],
-            '定制内容': ['定制内容'],
-            '软件版本/产品名称': ['软件版本/产品名称', '产品名称'],
-            '硬件情况（分辨率）/原产品主型号': ['硬件情况（分辨率）/原产品主型号', '原产品主型号'],
-            '销售部门': ['销售部门'],
-            '定制人/销售经理': ['定制人/销售经理', '销售经理'],
-        }
-        def find_source_column(candidates):
-            for source_col in candidates:
-                source_clean = re.sub(r'[\s：()（）\n\t]', '', str(source_col)).strip()
-                for col in filtered_df.columns:
-                    col_clean = re.sub(r'[\s：()（）\n\t]', '', str(col)).strip()
-                    if col_clean == source_clean:
-                        return col
-            return None
-        for out_col in desired_order:
-            filled = False
-            if out_col in rev_cm:
-                norm = rev_cm[out_col]
-                if norm in matched and matched[norm] in filtered_df.columns:
-                    output_df[out_col] = filtered_df[matched[norm]]
-                    filled = True
-            if not filled:
-                src = find_source_column(alias_mappings.get(out_col, []))
-                if src:
-                    output_df[out_col] = filtered_df[src]
-                    filled = True
-            if not filled and out_col == '当前周':
-                output_df[out_col] = filtered_df['parsed_time'].dt.isocalendar().week
-                filled = True
-            if not filled:
-                output_df[out_col] = ""
-        try:
-            if ('发起时间' in output_df.columns) and (output_df['发起时间'].isna().all() or (output_df['发起时间'] == "").all()):
-                output_df['发起时间'] = filtered_df['parsed_time']
-        except Exception:
-            pass
-        if product_contact_list and isinstance(product_contact_list, list):
-            if '产品线' in output_df.columns:
-                prod_series = output_df['产品线'].astype(str).str.strip()
-                all_empty = (prod_series == "").all()
-                if all_empty and len(product_contact_list) == 1:
-                    default_product, _default_contact = product_contact_list[0]
-                    output_df['产品线'] = default_product
-            if '产品线' in output_df.columns and '对接人（发起人）' in output_df.columns:
-                for product, contact in product_contact_list:
-                    mask = output_df['产品线'].astype(str).str.strip().str.lower() == str(product).strip().lower()
-                    if str(replace_mode).lower() == 'fill_empty':
-                        empty_mask = output_df['对接人（发起人）'].astype(str).str.strip() == ""
-                        output_df.loc[mask & empty_mask, '对接人（发起人）'] = contact
-                    else:
-                        output_df.loc[mask, '对接人（发起人）'] = contact
-        elif target_product and new_contact:
-            if '产品线' in output_df.columns and '对接人（发起人）' in output_df.columns:
-                output_df.loc[output_df['产品线'] == target_product, '对接人（发起人）'] = new_contact
+        cancel_core.check_cancelled(cancel_event)
+        with report_core.stage(report, 'assemble', rows_in=len(filtered_df)) as st:
+            # 当前周按解析后的时间计算（覆盖源表同名列）；各输出列直接引用源列，最后一次构造结果表
+            week = filtered_df['parsed_time'].dt.isocalendar().week
+            source_columns = list(filtered_df.columns)
+            if '当前周' not in source_columns:
+                source_columns.append('当前周')
+
+            def source(col):
+                return week if col == '当前周' else filtered_df[col]
+
+            cm = column_mapper.get_output_columns()
+            rev_cm = {v: k for k, v in cm.items()}
+            fallback_sources = mapping_core.ColumnMapper.default_output_index().resolve(source_columns, alias_priority=True)
+            columns = {}
+            for out_col in desired_order:
+                norm = rev_cm.get(out_col)
+                if norm in matched and matched[norm] in source_columns:
+                    columns[out_col] = source(matched[norm])
+                elif fallback_sources.get(out_col):
+                    columns[out_col] = source(fallback_sources[out_col])
+                elif out_col == '当前周':
+                    columns[out_col] = week
+                else:
+                    columns[out_col] = ""
+            try:
+                start_time = columns['发起时间']
+                if isinstance(start_time, str) or start_time.isna().all() or (start_time == "").all():
+                    columns['发起时间'] = filtered_df['parsed_time']
+            except Exception:
+                pass
+            output_df = pd.DataFrame(columns, index=filtered_df.index, copy=False)
+            st.rows_out = len(output_df)
+        cancel_core.check_cancelled(cancel_event)
         if '发起时间' in output_df.columns:
-            output_df['发起时间'] = pd.to_datetime(output_df['发起时间'], errors='coerce')
-            output_df = output_df.sort_values(by='发起时间', ascending=False, na_position='last')
+            with report_core.stage(report, 'date_parse', '发起时间', rows_in=len(output_df)):
+                output_df['发起时间'] = dates_core.parse_datetime_column(output_df['发起时间'], cancel_event=cancel_event)
+        progress.set_fraction('transform', 0.7)
+        if store is not None:
+            with report_core.stage(report, 'state', 'merge', rows_in=len(output_df)) as st:
+                output_df['parsed_time'] = filtered_df['parsed_time']
+                output_df, state_df = incremental_core.merge_rows(ident, is_new, output_df, reused)
+                st.rows_out = len(output_df)
+            if start_date and end_date:
+                with report_core.stage(report, 'filter', rows_in=len(output_df)) as st:
+                    output_df = output_df[(output_df['parsed_time'] >= start_date) & (output_df['parsed_time'] <= end_date)]
+                    st.rows_out = len(output_df)
+                progress.stage(f"日期筛选完成，剩余 {len(output_df)} 行记录")
+            output_df = output_df.drop(columns='parsed_time')
+        with report_core.stage(report, 'remap', rows_in=len(output_df)):
+            if product_contact_list and isinstance(product_contact_list, list):
+                if '产品线' in output_df.columns and len(product_contact_list) == 1:
+                    if (transform_core.product_keys(output_df['产品线']) == "").all():
+                        default_product, _default_contact = product_contact_list[0]
+                        output_df['产品线'] = default_product
+                if '产品线' in output_df.columns and '对接人（发起人）' in output_df.columns:
+                    cancel_core.check_cancelled(cancel_event)
+                    fill_empty = str(replace_mode).lower() == 'fill_empty'
+                    contacts = transform_core.contact_lookup(output_df['产品线'], product_contact_list, first_wins=fill_empty)
+                    mask = contacts.notna()
+                    if fill_empty:
+                        mask &= output_df['对接人（发起人）'].astype(str).str.strip() == ""
+                    transform_core.assign(output_df, '对接人（发起人）', mask, contacts[mask])
+            elif target_product and new_contact:
+                if '产品线' in output_df.columns and '对接人（发起人）' in output_df.columns:
+                    transform_core.assign(output_df, '对接人（发起人）', output_df['产品线'] == target_product, new_contact)
+        progress.set_fraction('transform', 0.8)
+        cancel_core.check_cancelled(cancel_event)
+        if '发起时间' in output_df.columns:
+            with report_core.stage(report, 'sort', rows_in=len(output_df)):
+                output_df = output_df.sort_values(by='发起时间', ascending=False, na_position='last')
         elif 'parsed_time' in filtered_df.columns:
-            output_df = output_df.iloc[filtered_df['parsed_time'].sort_values(ascending=False, na_position='last').index]
-        if progress_callback:
-            progress_callback(95, f"正在保存结果到: {output_file}")
-        if cancel_event and getattr(cancel_event, 'is_set', None) and cancel_event.is_set():
-            return False
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            output_df.to_excel(writer, index=False, sheet_name='处理结果')
-            worksheet = writer.sheets['处理结果']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-                for cell in column:
-                    cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='left')
-        if progress_callback:
-            progress_callback(100, "文件处理完成!")
-        return True
+            with report_core.stage(report, 'sort', rows_in=len(output_df)):
+                output_df = output_df.iloc[filtered_df['parsed_time'].sort_values(ascending=False, na_position='last').index]
+        if store is not None:
+            with report_core.stage(report, 'state', 'store', rows_in=len(state_df)):
+                store.store(state_sig, state_df)
+        if report is not None:
+            report.rows_out = len(output_df)
+        progress.complete('transform')
+        return output_df
+    except cancel_core.ProcessCancelled:
+        return None
     except Exception as e:
         raise e
+    finally:
+        if session is not None:
+            session.close()
+
+
+def process_raw_excel(input_file, output_file, start_date=None, end_date=None, target_product=None, new_contact=None, product_contact_list=None, replace_mode='overwrite', progress_callback=None, cancel_event=None, streaming=False, batch_size=5000, workers=None, cache=None, write_engine=None, output_format=None, report=None, report_json=False, state=None, arrow_strings=False):
+    """处理并写出结果；成功返回 True，取消返回 False。
 
+    report 为 RunReport 时就地记录各阶段耗时；report_json 为 True 时在结果文件旁写出
+    <结果文件名>.report.json（未传入 report 时自动创建）。
+    进度按实际工作量计算并节流后回调 progress_callback(percent, message)。
+    state 为增量状态文件路径时只处理新增或变更的行（见 build_output_frame）。
+    arrow_strings 为 True 时整个流程的文本列以 string[pyarrow] 存储。
+    """
+    progress = progress_core.ProgressTracker.wrap(progress_callback)
+    try:
+        fmt = writer_core.detect_format(output_file, output_format)
+        progress.plan_output(writer_core.excel_engine(write_engine) if fmt == 'xlsx' else fmt)
+    except Exception:
+        pass
+    if report is None and report_json:
+        report = report_core.RunReport()
+    if report is not None:
+        report.input_file = str(input_file)
+        report.output_file = writer_core.output_path(output_file, output_format)
+    output_df = build_output_frame(
+        input_file,
+        start_date,
+        end_date,
+        target_product=target_product,
+        new_contact=new_contact,
+        product_contact_list=product_contact_list,
+        replace_mode=replace_mode,
+        progress_callback=progress,
+        cancel_event=cancel_event,
+        streaming=streaming,
+        batch_size=batch_size,
+        workers=workers,
+        cache=cache,
+        report=report,
+        state=state,
+        arrow_strings=arrow_strings,
+    )
+    if output_df is None:
+        if report is not None:
+            report.cancelled = True
+        return False
+    progress.stage(f"正在保存结果到: {writer_core.output_path(output_file, output_format)}")
+    try:
+        writer_core.write_output(output_df, output_file, output_format, engine=write_engine, cancel_event=cancel_event, report=report, progress=progress)
+    except cancel_core.ProcessCancelled:
+        if report is not None:
+            report.cancelled = True
+        return False
+    if report_json:
+        report.write_json(report_core.report_path(report.output_file))
+    progress.finish("文件处理完成!")
+    return True
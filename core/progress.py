@@ -0,0 +1,231 @@
+import time
+
+# 各阶段每行的相对开销（以读取一行 xlsx 为 1），用于把不同阶段换算为统一的工作量
+TRANSFORM_COST = 0.05
+WRITE_COST = {
+    'openpyxl': 2.0,
+    'write_only': 1.5,
+    'csv': 0.03,
+    'parquet': 0.01,
+    'feather': 0.01,
+}
+# 回调最小间隔（秒），界面刷新开销控制在运行时间的 1% 以内
+MIN_INTERVAL = 0.1
+# 至少完成这一比例且运行满 ETA_MIN_ELAPSED 秒后才给出剩余时间
+ETA_MIN_FRACTION = 0.03
+ETA_MIN_ELAPSED = 2.0
+# 阶段完成这一比例且运行满 PHASE_MIN_ELAPSED 秒后，改用该阶段实测速度估算其剩余时间
+PHASE_MIN_FRACTION = 0.05
+PHASE_MIN_ELAPSED = 0.5
+# 估计输出比例时每个工作表抽样的行数
+OUTPUT_SAMPLE_ROWS = 500
+
+
+def format_eta(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} 秒"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} 分 {seconds} 秒"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} 小时 {minutes} 分"
+
+
+class ProgressTracker:
+    """按实际工作量计算进度。
+
+    工作量分三个阶段：read（打开工作簿与解析各工作表 XML，按字节计）、transform
+    （日期解析、筛选、映射、排序）和 write（写出的行），统一换算为“读取一行”的开销；
+    百分比只增不减。回调按 min_interval 节流，消息后附带预计剩余时间：各阶段有足够
+    实测数据后按该阶段自身的速度估算，否则按整体平均速度估算。
+    """
+
+    PHASES = ('read', 'transform', 'write')
+
+    def __init__(self, callback=None, min_interval=MIN_INTERVAL):
+        self._callback = callback
+        self._min_interval = min_interval
+        self._total = dict.fromkeys(self.PHASES, 0.0)
+        self._done = dict.fromkeys(self.PHASES, 0.0)
+        self._sheets = {}
+        self._shared_bytes = 0
+        self._finished = set()
+        self._bytes_per_row = 1.0
+        self._open_units = 0.0
+        self._opened = False
+        self._write_cost = WRITE_COST['write_only']
+        # 可选：df -> 预计保留的行比例，用于筛选前估计写出量
+        self.output_ratio = None
+        self._kept_rows = 0.0
+        self._sampled_rows = 0
+        self._started = time.perf_counter()
+        # 阶段 -> (开始时间, 开始时已完成量)
+        self._clock = {'read': (self._started, 0.0)}
+        self._last_emit = 0.0
+        self._last = None
+        self._percent = 0
+        self.message = ""
+
+    @classmethod
+    def wrap(cls, progress_callback):
+        """已是 ProgressTracker 时原样返回，否则包装回调（可为 None）。"""
+        if isinstance(progress_callback, cls):
+            return progress_callback
+        return cls(progress_callback)
+
+    def plan_workbook(self, sheet_sizes, shared_strings_bytes=0):
+        """按 xlsx_probe.sheet_sizes 的结果规划工作量：{名称: (XML 字节数, 估计行数)}。"""
+        self._sheets = dict(sheet_sizes)
+        self._shared_bytes = shared_strings_bytes
+        total_bytes = sum(size for size, _rows in self._sheets.values())
+        total_rows = sum(rows for _size, rows in self._sheets.values())
+        self._bytes_per_row = total_bytes / total_rows if total_rows else 1.0
+        self._open_units = shared_strings_bytes / self._bytes_per_row
+        self._total['read'] = self._open_units + total_bytes / self._bytes_per_row
+        self._total['transform'] = total_rows * TRANSFORM_COST
+        # 输出行数未知时按全部行（或已抽样的保留比例）估计，筛选后由 plan_write 修正
+        self._plan_output_rows()
+
+    def plan_sheets(self, sheet_names):
+        """只保留实际读取的数据工作表。"""
+        if self._sheets:
+            self.plan_workbook({name: self._sheets[name] for name in sheet_names if name in self._sheets}, self._shared_bytes)
+
+    def plan_output(self, engine):
+        """预先告知写出方式（'openpyxl'、'write_only'、'csv' 等），用于估计写出开销。"""
+        self._write_cost = WRITE_COST.get(engine, 1.0)
+        self._plan_output_rows()
+
+    def plan_rows(self, phase, rows, cost=1.0):
+        self._total[phase] = float(rows * cost)
+        self._done[phase] = min(self._done[phase], self._total[phase])
+        self._clock.setdefault(phase, (time.perf_counter(), self._done[phase]))
+
+    def plan_write(self, rows, engine):
+        self._write_cost = WRITE_COST.get(engine, 1.0)
+        self.plan_rows('write', rows, self._write_cost)
+
+    def update(self, phase, units, message=None, force=False):
+        """设置阶段已完成的工作量（不超过该阶段总量）。"""
+        self._done[phase] = max(self._done[phase], min(float(units), self._total[phase]))
+        self._emit(message, force)
+
+    def set_fraction(self, phase, fraction, message=None, force=False):
+        self.update(phase, fraction * self._total[phase], message, force)
+
+    def complete(self, phase, message=None):
+        self.update(phase, self._total[phase], message, force=message is not None)
+
+    def opened(self, message=None):
+        """工作簿已打开（共享字符串表已解析）。"""
+        self._opened = True
+        self.update('read', self._read_done(), message, force=message is not None)
+
+    def sheet_rows(self, sheet_name, rows, message=None):
+        """工作表已解析 rows 行；按该表字节数折算，读完前单表最多计 95%。"""
+        size, estimated = self._sheets.get(sheet_name, (0, 0))
+        if not estimated:
+            return
+        fraction = min(rows / estimated, 0.95)
+        self.update('read', self._read_done() + fraction * size / self._bytes_per_row, message)
+
+    def sheet_loaded(self, df, rows=None):
+        """工作表已读入：按 output_ratio 抽样估计保留比例，修正写出量。
+
+        rows 为读取行数（读取时已按日期筛选、df 只含保留行时传入）。
+        """
+        rows = len(df) if rows is None else rows
+        if self.output_ratio is None or not rows:
+            return
+        step = max(1, len(df) // OUTPUT_SAMPLE_ROWS)
+        try:
+            ratio = float(self.output_ratio(df.iloc[::step])) if len(df) else 0.0
+        except Exception:
+            return
+        self._kept_rows += ratio * len(df)
+        self._sampled_rows += rows
+        self._plan_output_rows()
+
+    def sheet_done(self, sheet_name, message=None):
+        self._finished.add(sheet_name)
+        self.update('read', self._read_done(), message, force=message is not None)
+
+    def rows_written(self, rows, message=None):
+        self.update('write', rows * self._write_cost, message)
+
+    def stage(self, message):
+        """阶段切换：立即发出一条消息。"""
+        self._emit(message, force=True)
+
+    def finish(self, message):
+        self._done = dict(self._total)
+        self._percent = 100
+        self.message = message
+        self._send(100, message)
+
+    @property
+    def fraction(self):
+        total = sum(self._total.values())
+        return min(sum(self._done.values()) / total, 1.0) if total else 0.0
+
+    @property
+    def percent(self):
+        return self._percent
+
+    def eta(self):
+        """估算剩余秒数；数据不足时返回 None。"""
+        fraction = self.fraction
+        now = time.perf_counter()
+        elapsed = now - self._started
+        if fraction < ETA_MIN_FRACTION or elapsed < ETA_MIN_ELAPSED or fraction >= 1:
+            return None
+        average = elapsed / sum(self._done.values())
+        remaining = 0.0
+        for phase in self.PHASES:
+            left = self._total[phase] - self._done[phase]
+            if left <= 0:
+                continue
+            rate = average
+            if phase in self._clock:
+                started, done_before = self._clock[phase]
+                done = self._done[phase] - done_before
+                if now - started >= PHASE_MIN_ELAPSED and done >= self._total[phase] * PHASE_MIN_FRACTION:
+                    rate = (now - started) / done
+            remaining += left * rate
+        return remaining
+
+    def _plan_output_rows(self):
+        if not self._sheets or 'write' in self._clock:
+            return
+        rows = sum(rows for _size, rows in self._sheets.values())
+        if self._sampled_rows:
+            rows *= self._kept_rows / self._sampled_rows
+        self._total['write'] = rows * self._write_cost
+
+    def _read_done(self):
+        done = self._open_units if self._opened else 0.0
+        return done + sum(self._sheets[name][0] for name in self._finished if name in self._sheets) / self._bytes_per_row
+
+    def _emit(self, message, force):
+        if message is not None:
+            self.message = message
+        if self._callback is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_emit < self._min_interval:
+            return
+        self._percent = max(self._percent, min(99, int(self.fraction * 100)))
+        text = self.message
+        eta = self.eta()
+        if eta is not None and eta >= 1:
+            text = f"{text}（预计剩余 {format_eta(eta)}）"
+        if not force and self._last == (self._percent, text):
+            return
+        self._last_emit = now
+        self._send(self._percent, text)
+
+    def _send(self, percent, text):
+        self._last = (percent, text)
+        if self._callback is not None:
+            self._callback(percent, text)
@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+try:
+    import resource
+except Exception:
+    resource = None
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+
+def peak_rss():
+    """当前进程的峰值常驻内存（字节）；平台不支持时返回 None。"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', None) or info.rss
+    return None
+
+
+@dataclass
+class StageTiming:
+    """单个处理阶段的耗时记录。
+
+    cpu 为进程 CPU 时间（含其他线程）；rss_delta 为阶段内峰值内存的增量（字节），
+    峰值只增不减，未突破此前峰值时为 0。
+    """
+    name: str
+    detail: str = ""
+    wall: float = 0.0
+    cpu: float = 0.0
+    rows_in: int = None
+    rows_out: int = None
+    rss_delta: int = None
+
+
+@dataclass
+class RunReport:
+    """一次处理的运行报告：各阶段耗时、行数与内存变化。"""
+    input_file: str = ""
+    output_file: str = ""
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+    rows_in: int = 0
+    rows_out: int = 0
+    cancelled: bool = False
+    stages: list = field(default_factory=list)
+
+    def rows_read(self):
+        """各 read 阶段记录的读取行数之和；均未记录时返回 None。"""
+        counts = [s.rows_in for s in self.stages if s.name == 'read' and s.rows_in is not None]
+        return sum(counts) if counts else None
+
+    @contextmanager
+    def stage(self, name, detail="", rows_in=None):
+        """记录一个阶段；在 with 块内设置返回记录的 rows_out。"""
+        record = StageTiming(name, detail, rows_in=rows_in)
+        rss_before = peak_rss()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall
+            record.cpu = time.process_time() - cpu
+            rss_after = peak_rss()
+            if rss_before is not None and rss_after is not None:
+                record.rss_delta = rss_after - rss_before
+            self.stages.append(record)
+
+    @property
+    def total_wall(self):
+        return sum(s.wall for s in self.stages)
+
+    def to_dict(self):
+        data = asdict(self)
+        data['total_wall'] = self.total_wall
+        return data
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def format_table(self):
+        lines = [f"{'阶段':<14}{'耗时(s)':>9}{'CPU(s)':>9}{'行数入':>9}{'行数出':>9}{'内存增量(MB)':>14}"]
+        for s in self.stages:
+            name = f"{s.name}:{s.detail}" if s.detail else s.name
+            rss = f"{s.rss_delta / 1048576:.1f}" if s.rss_delta is not None else "-"
+            rows_in = s.rows_in if s.rows_in is not None else "-"
+            rows_out = s.rows_out if s.rows_out is not None else "-"
+            lines.append(f"{name:<14}{s.wall:>9.3f}{s.cpu:>9.3f}{rows_in:>9}{rows_out:>9}{rss:>14}")
+        lines.append(f"{'合计':<14}{self.total_wall:>9.3f}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def stage(report, name, detail="", rows_in=None):
+    """report 为 None 时不做任何记录，调用处无需判断。"""
+    if report is None:
+        yield StageTiming(name, detail, rows_in=rows_in)
+        return
+    with report.stage(name, detail, rows_in) as record:
+        yield record
+
+
+def report_path(output_file):
+    """结果文件旁的报告路径：<结果文件名>.report.json。"""
+    root, _ext = os.path.splitext(str(output_file))
+    return root + '.report.json'
@@ -0,0 +1,206 @@
+import pandas as pd
+from pandas.io.parsers import TextParser
+from core import cancel as cancel_core
+from core import transform as transform_core
+from core import dates as dates_core
+from core import report as report_core
+
+
+# 取消检查的行间隔，保证大批次读取时也能及时响应
+CANCEL_CHECK_ROWS = 256
+
+
+def _trim(row):
+    end = len(row)
+    while end and row[end - 1] is None:
+        end -= 1
+    return row[:end]
+
+
+def _cell_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _to_frame(header_row, rows):
+    """与 pandas.read_excel 相同的方式构建 DataFrame（相同的类型推断与列名处理）。"""
+    data = [[_cell_value(v) for v in _trim(header_row)]]
+    data.extend([_cell_value(v) for v in _trim(row)] for row in rows)
+    width = max(len(row) for row in data)
+    for row in data:
+        if len(row) < width:
+            row.extend([''] * (width - len(row)))
+    return TextParser(data, header=0, converters={'发起时间': str}).read()
+
+
+def iter_sheet_batches(session, sheet_name, header=1, batch_size=5000, cancel_event=None, progress=None):
+    """按批次流式读取工作表，结果与 read_sheet(header=1) + deep_clean_columns 一致。
+
+    每 CANCEL_CHECK_ROWS 行检查一次取消（取消时抛出 ProcessCancelled）并上报已解析行数。
+    """
+    rows = session.iter_rows(sheet_name)
+    header_row = None
+    for idx, row in enumerate(rows):
+        if idx == header:
+            header_row = row
+            break
+    if header_row is None:
+        return
+    cleaned_columns = None
+    batch = []
+    for count, row in enumerate(rows, start=1):
+        if count % CANCEL_CHECK_ROWS == 0:
+            cancel_core.check_cancelled(cancel_event)
+            if progress is not None:
+                progress.sheet_rows(sheet_name, count)
+        if all(v is None for v in row):
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            df = _to_frame(header_row, batch)
+            batch = []
+            if cleaned_columns is None:
+                df = transform_core.deep_clean_columns(df)
+                cleaned_columns = list(df.columns)
+            else:
+                df.columns = cleaned_columns
+                df = df.dropna(how='all')
+            yield df
+    if batch:
+        df = _to_frame(header_row, batch)
+        if cleaned_columns is None:
+            df = transform_core.deep_clean_columns(df)
+        else:
+            df.columns = cleaned_columns
+            df = df.dropna(how='all')
+        yield df
+    elif cleaned_columns is None:
+        yield transform_core.deep_clean_columns(_to_frame(header_row, []))
+
+
+def read_sheet(session, sheet_name, batch_size=5000, cancel_event=None, progress=None):
+    """分批读取整张工作表并合并，读取过程中可被取消。"""
+    frames = list(iter_sheet_batches(session, sheet_name, batch_size=batch_size, cancel_event=cancel_event, progress=progress))
+    if not frames:
+        raise Exception(f"工作表 {sheet_name} 没有数据")
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+class DateRangeFilter:
+    """读取时按日期范围筛选，结果与合并全部工作表后再解析、筛选一致。
+
+    各批次只按时间列解析（不做行文本兜底）。合并后整体解析时，只有全部行的时间都无法解析
+    才会按行文本兜底，因此在出现第一个可解析的时间之前，无法解析的批次先原样暂存；
+    全部读完仍未出现时，由 finish 对暂存行合并后统一兜底解析并筛选。
+    """
+
+    def __init__(self, start_date, end_date, cancel_event=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.cancel_event = cancel_event
+        self.found = False
+        self._pending = []
+
+    def apply(self, df, parsed=False):
+        """返回 df 中范围内的行（独立副本，含 parsed_time 列）；parsed 为 True 时 df 已含 parsed_time。
+
+        df 应已带上 数据来源 列，暂存的行在兜底解析时与合并后的结果一致。
+        """
+        if not parsed:
+            df['parsed_time'] = dates_core.parse_time_column(df, fallback=False, cancel_event=self.cancel_event)
+        if not self.found and len(df):
+            if df['parsed_time'].isna().all():
+                self._pending.append(df)
+                return df.iloc[:0].copy()
+            self.note_found()
+        return self._in_range(df)
+
+    def note_found(self):
+        """已有行解析出时间：不会再兜底，暂存的行（时间均无法解析）不在范围内，直接丢弃。"""
+        self.found = True
+        self._pending = []
+
+    def finish(self):
+        """全部读完后仍没有可解析的时间时，按行文本兜底解析暂存行并返回范围内的行；否则返回 None。"""
+        if self.found or not self._pending:
+            return None
+        df = transform_core.concat_frames(self._pending)
+        self._pending = []
+        cancel_core.check_cancelled(self.cancel_event)
+        df['parsed_time'] = dates_core.scan_frame_for_dates(df.drop(columns='parsed_time'))
+        return self._in_range(df)
+
+    def _in_range(self, df):
+        # 取副本：调用方会就地添加列、转换列类型
+        return df[(df['parsed_time'] >= self.start_date) & (df['parsed_time'] <= self.end_date)].copy()
+
+
+def read_sheet_in_range(session, sheet_name, date_filter, batch_size=5000, cancel_event=None, progress=None):
+    """分批读取工作表并由 date_filter（DateRangeFilter）逐批筛选，只合并范围内的行；返回 (DataFrame, 读取行数)。"""
+    kept = []
+    rows = 0
+    for df in iter_sheet_batches(session, sheet_name, batch_size=batch_size, cancel_event=cancel_event, progress=progress):
+        rows += len(df)
+        df['数据来源'] = sheet_name
+        kept.append(date_filter.apply(df))
+    if not kept:
+        raise Exception(f"工作表 {sheet_name} 没有数据")
+    if len(kept) == 1:
+        return kept[0], rows
+    return pd.concat(kept, ignore_index=True), rows
+
+
+def stream_sheets(session, sheet_names, start_date=None, end_date=None, batch_size=5000, cancel_event=None, progress=None, report=None, arrow_strings=False):
+    """流式读取并按日期范围过滤，仅保留区间内的行。
+
+    返回合并后的 DataFrame；取消时返回 None。给出日期范围时含 parsed_time 列：日期只按时间列逐批解析，
+    行文本兜底与整体解析一致，仅在全部行都无法解析时使用（见 DateRangeFilter）；
+    未给出范围时不解析日期，由调用方在合并后统一解析。
+    report 中每个工作表记录一个 read 阶段（含日期解析与筛选）。
+    arrow_strings 为 True 时保留的文本列以 string[pyarrow] 存储。
+    """
+    kept = []
+    schemas = []
+    date_filter = DateRangeFilter(start_date, end_date, cancel_event) if start_date and end_date else None
+    for sheet_name in sheet_names:
+        if progress is not None:
+            progress.stage(f"正在流式读取工作表: {sheet_name}")
+        try:
+            with report_core.stage(report, 'read', sheet_name) as st:
+                st.rows_in = st.rows_out = 0
+                for df in iter_sheet_batches(session, sheet_name, batch_size=batch_size, cancel_event=cancel_event, progress=progress):
+                    st.rows_in += len(df)
+                    df['数据来源'] = sheet_name
+                    if date_filter is not None:
+                        df['parsed_time'] = dates_core.parse_time_column(df, fallback=False, cancel_event=cancel_event)
+                    if not schemas or list(schemas[-1].columns) != list(df.columns):
+                        schemas.append(df.iloc[:0])
+                    if date_filter is not None:
+                        df = date_filter.apply(df, parsed=True)
+                    if len(df):
+                        kept.append(transform_core.compact(df, arrow_strings))
+                        st.rows_out += len(df)
+        except cancel_core.ProcessCancelled:
+            return None
+        except Exception:
+            continue
+        finally:
+            if progress is not None:
+                progress.sheet_done(sheet_name)
+    if date_filter is not None:
+        try:
+            tail = date_filter.finish()
+        except cancel_core.ProcessCancelled:
+            return None
+        if tail is not None and len(tail):
+            kept.append(transform_core.compact(tail, arrow_strings))
+    if not kept:
+        if not schemas:
+            return pd.DataFrame(columns=['数据来源', 'parsed_time'] if date_filter is not None else ['数据来源'])
+        return pd.concat(schemas, ignore_index=True)
+    return transform_core.concat_frames(kept)
@@ -0,0 +1,138 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_DOC_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_CELL_REF = re.compile(r'([A-Z]+)(\d+)')
+
+
+def _column_index(ref):
+    letters = _CELL_REF.match(ref).group(1)
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx - 1
+
+
+def _workbook_sheets(zf):
+    rels = {}
+    with zf.open('xl/_rels/workbook.xml.rels') as f:
+        for rel in ET.parse(f).getroot().iter(f'{_NS_PKG_REL}Relationship'):
+            target = rel.get('Target')
+            if target.startswith('/'):
+                path = target.lstrip('/')
+            else:
+                path = posixpath.normpath(posixpath.join('xl', target))
+            rels[rel.get('Id')] = path
+    sheets = []
+    with zf.open('xl/workbook.xml') as f:
+        for sheet in ET.parse(f).getroot().iter(f'{_NS_MAIN}sheet'):
+            sheets.append((sheet.get('name'), rels.get(sheet.get(f'{_NS_DOC_REL}id'))))
+    return sheets
+
+
+def _head_cells(zf, path, nrows):
+    """只解析前 nrows 行的单元格，读到后续行立即停止。"""
+    rows = {}
+    with zf.open(path) as f:
+        for _event, elem in ET.iterparse(f, events=('end',)):
+            if elem.tag != f'{_NS_MAIN}row':
+                continue
+            row_number = int(elem.get('r', len(rows) + 1))
+            if row_number > nrows:
+                break
+            cells = []
+            for pos, c in enumerate(elem.iter(f'{_NS_MAIN}c')):
+                ref = c.get('r')
+                col = _column_index(ref) if ref else pos
+                kind = c.get('t')
+                if kind == 'inlineStr':
+                    value = ''.join(t.text or '' for t in c.iter(f'{_NS_MAIN}t'))
+                else:
+                    v = c.find(f'{_NS_MAIN}v')
+                    value = v.text if v is not None else None
+                if value is None or value == '':
+                    continue
+                cells.append((col, kind, value))
+            rows[row_number] = cells
+            elem.clear()
+    return [rows.get(i, []) for i in range(1, nrows + 1)]
+
+
+def _shared_strings(zf, wanted):
+    """按需读取共享字符串表，取到最大所需下标后停止。"""
+    if not wanted or 'xl/sharedStrings.xml' not in zf.namelist():
+        return {}
+    last = max(wanted)
+    found = {}
+    idx = 0
+    with zf.open('xl/sharedStrings.xml') as f:
+        for _event, elem in ET.iterparse(f, events=('end',)):
+            if elem.tag != f'{_NS_MAIN}si':
+                continue
+            if idx in wanted:
+                found[idx] = ''.join(t.text or '' for t in elem.iter(f'{_NS_MAIN}t'))
+            elem.clear()
+            if idx >= last:
+                break
+            idx += 1
+    return found
+
+
+def probe_headers(file_path, nrows=2):
+    """读取每个工作表前 nrows 行的值，返回 [(sheet_name, rows)]，rows 为按列展开的值列表。"""
+    with zipfile.ZipFile(file_path) as zf:
+        sheets = _workbook_sheets(zf)
+        heads = []
+        wanted = set()
+        for name, path in sheets:
+            cells = _head_cells(zf, path, nrows) if path in zf.namelist() else []
+            heads.append((name, cells))
+            for row in cells:
+                wanted.update(int(value) for _col, kind, value in row if kind == 's')
+        strings = _shared_strings(zf, wanted)
+    result = []
+    for name, cells in heads:
+        rows = []
+        for row in cells:
+            width = max((col for col, _kind, _value in row), default=-1) + 1
+            values = [None] * width
+            for col, kind, value in row:
+                values[col] = strings.get(int(value)) if kind == 's' else value
+            rows.append(values)
+        result.append((name, rows))
+    return result
+
+
+_DIMENSION = re.compile(rb'<(?:\w+:)?dimension ref="[A-Z]+\d+(?::[A-Z]+(\d+))?"')
+_ROW_START = re.compile(rb'<(?:\w+:)?row[ >]')
+_SAMPLE_BYTES = 65536
+
+
+def _estimate_rows(zf, path, xml_bytes):
+    """优先取 <dimension> 声明的行数；缺失时按开头样本的平均行长估算。"""
+    with zf.open(path) as f:
+        head = f.read(_SAMPLE_BYTES)
+    match = _DIMENSION.search(head[:4096])
+    if match and match.group(1):
+        return int(match.group(1))
+    rows = [m.start() for m in _ROW_START.finditer(head)]
+    if len(rows) < 2:
+        return len(rows)
+    bytes_per_row = (rows[-1] - rows[0]) / (len(rows) - 1)
+    return max(len(rows), int(xml_bytes / bytes_per_row))
+
+
+def sheet_sizes(file_path):
+    """返回 ({sheet_name: (xml_bytes, rows)}, shared_strings_bytes)，只读取压缩包目录与各表开头。"""
+    with zipfile.ZipFile(file_path) as zf:
+        infos = {info.filename: info.file_size for info in zf.infolist()}
+        sizes = {}
+        for name, path in _workbook_sheets(zf):
+            if path not in infos:
+                continue
+            sizes[name] = (infos[path], _estimate_rows(zf, path, infos[path]))
+        return sizes, infos.get('xl/sharedStrings.xml', 0)